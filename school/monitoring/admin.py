@@ -0,0 +1,76 @@
+import datetime
+from itertools import groupby
+
+from django.contrib import admin
+from django.shortcuts import render
+from django.urls import path
+from django.utils import timezone
+
+from .models import RequestTiming
+
+# Hours of sampled requests the percentile view covers by default
+PERCENTILE_WINDOW_HOURS = 24
+
+
+def percentile(ordered, fraction):
+    # Nearest-rank percentile of an already sorted list
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def route_percentiles(since):
+    """Per-route latency percentiles of the requests sampled since `since`, slowest p95 first."""
+    rows = (RequestTiming.objects.filter(created__gte=since).order_by('route', 'total_ms')
+            .values_list('route', 'total_ms', 'sql_count', 'sql_ms', 'template_ms').iterator())
+    routes = []
+    for route, timings in groupby(rows, key=lambda row: row[0]):
+        timings = list(timings)
+        totals = [row[1] for row in timings]
+        count = len(timings)
+        routes.append({
+            'route': route,
+            'count': count,
+            'p50': percentile(totals, 0.50),
+            'p95': percentile(totals, 0.95),
+            'p99': percentile(totals, 0.99),
+            'max': totals[-1],
+            'queries': sum(row[2] for row in timings) / count,
+            'sql_ms': sum(row[3] for row in timings) / count,
+            'template_ms': sum(row[4] for row in timings) / count,
+        })
+    routes.sort(key=lambda row: row['p95'], reverse=True)
+    return routes
+
+
+@admin.register(RequestTiming)
+class RequestTimingAdmin(admin.ModelAdmin):
+    list_display = ('created', 'method', 'route', 'status', 'total_ms', 'sql_count', 'sql_ms', 'template_ms')
+    list_filter = ('method', 'status')
+    search_fields = ('route',)
+    date_hierarchy = 'created'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        urls = [
+            path('percentiles/', self.admin_site.admin_view(self.percentiles_view),
+                 name='monitoring_requesttiming_percentiles'),
+        ]
+        return urls + super().get_urls()
+
+    def percentiles_view(self, request):
+        try:
+            hours = max(int(request.GET.get('hours', PERCENTILE_WINDOW_HOURS)), 1)
+        except ValueError:
+            hours = PERCENTILE_WINDOW_HOURS
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Request latency by route',
+            'hours': hours,
+            'routes': route_percentiles(timezone.now() - datetime.timedelta(hours=hours)),
+        }
+        return render(request, 'admin/monitoring/requesttiming/percentiles.html', context)
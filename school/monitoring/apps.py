@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class MonitoringConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'monitoring'
+
+    def ready(self):
+        # Time template rendering for instrumented requests
+        from .instrumentation import instrument_templates
+        instrument_templates()
@@ -0,0 +1,66 @@
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from django.template.base import Template
+
+# The measurements of the request being instrumented in this context, if any
+current_metrics = ContextVar('current_metrics', default=None)
+
+
+class RequestMetrics:
+    """Counters filled in while one request is handled."""
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        # SQL run while a template was rendering, e.g. lazy querysets; part of template_seconds too
+        self.template_sql_seconds = 0.0
+        self.template_seconds = 0.0
+        self.template_depth = 0
+        self.queries = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        # Database execute_wrapper: time every query and count its SQL text, which
+        # holds placeholders instead of values and so fingerprints the query
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.sql_count += 1
+            self.sql_seconds += elapsed
+            if self.template_depth:
+                self.template_sql_seconds += elapsed
+            self.queries[sql] += 1
+
+    def duplicates(self, threshold):
+        """The queries run at least `threshold` times, most repeated first."""
+        return [(sql, count) for sql, count in self.queries.most_common() if count >= threshold]
+
+
+def instrument_templates():
+    """
+    Wrap Template.render so the outermost render of an instrumented request
+    is timed; includes and extends are nested renders and already counted.
+    Without a request being instrumented the cost is one ContextVar lookup.
+    """
+    if getattr(Template.render, 'instrumented', False):
+        return
+    render = Template.render
+
+    def timed_render(self, context):
+        metrics = current_metrics.get()
+        if metrics is None:
+            return render(self, context)
+        metrics.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            metrics.template_depth -= 1
+            if not metrics.template_depth:
+                metrics.template_seconds += time.perf_counter() - started
+
+    timed_render.instrumented = True
+    Template.render = timed_render
@@ -0,0 +1,18 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from monitoring.models import RequestTiming
+
+
+class Command(BaseCommand):
+    help = 'Delete sampled request timings older than the given number of days'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=14, help='Timings to keep, in days (default 14)')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - datetime.timedelta(days=options['days'])
+        deleted, _ = RequestTiming.objects.filter(created__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} request timing(s)"))
@@ -0,0 +1,144 @@
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+from .instrumentation import RequestMetrics, current_metrics
+from .models import RequestTiming
+
+logger = logging.getLogger('monitoring.requests')
+
+# Longest SQL text kept per duplicate query
+MONITORING_SQL_LENGTH = 300
+
+
+def route_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unresolved>'
+    return match.view_name or match.route
+
+
+class PerformanceMiddleware:
+    """
+    Measure SQL (count, time, repeated queries), template rendering and total
+    time of a sample of requests. Measured requests get a Server-Timing
+    header; sampled ones are also logged as JSON and stored as RequestTiming
+    rows for the admin's percentile view. Requests that are not measured
+    only cost a random() call.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # Fraction of requests measured, logged and stored; 0 turns sampling off
+        self.sample_rate = getattr(settings, 'MONITORING_SAMPLE_RATE', 0.01)
+        # Measure every request for its Server-Timing header, e.g. while developing
+        self.always = getattr(settings, 'MONITORING_SERVER_TIMING_ALWAYS', settings.DEBUG)
+        # A query run this many times in one request is reported as a probable N+1
+        self.duplicate_threshold = getattr(settings, 'MONITORING_DUPLICATE_THRESHOLD', 5)
+        # Under ASGI, stay async so async views are not run through a thread
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def sampled(self):
+        return bool(self.sample_rate) and random.random() < self.sample_rate
+
+    @staticmethod
+    def instrument_connections(metrics):
+        # Connections are per thread: enter and close the stack on the thread running the queries
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(metrics))
+        return stack
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        sampled = self.sampled()
+        if not (sampled or self.always):
+            return self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        started = time.perf_counter()
+        try:
+            with self.instrument_connections(metrics):
+                response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        total = time.perf_counter() - started
+        self.add_server_timing(response, metrics, total)
+        if sampled:
+            self.record(request, response, metrics, total)
+        return response
+
+    async def __acall__(self, request):
+        sampled = self.sampled()
+        if not (sampled or self.always):
+            return await self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        started = time.perf_counter()
+        # The ORM runs on the request's thread-sensitive executor, whose connections are wrapped here
+        stack = await sync_to_async(self.instrument_connections)(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+            current_metrics.reset(token)
+        total = time.perf_counter() - started
+        self.add_server_timing(response, metrics, total)
+        if sampled:
+            await sync_to_async(self.record)(request, response, metrics, total)
+        return response
+
+    def add_server_timing(self, response, metrics, total):
+        response.headers['Server-Timing'] = ', '.join(
+            f'{name};dur={value:.1f};desc="{description}"' for name, value, description in self.timings(metrics, total)
+        )
+
+    def timings(self, metrics, total):
+        sql_ms = metrics.sql_seconds * 1000
+        template_ms = (metrics.template_seconds - metrics.template_sql_seconds) * 1000
+        python_ms = max(total * 1000 - sql_ms - template_ms, 0)
+        timings = [
+            ('sql', sql_ms, f'{metrics.sql_count} queries'),
+            ('tpl', template_ms, 'Template rendering, without its queries'),
+            ('app', python_ms, 'Python'),
+            ('total', total * 1000, 'Total'),
+        ]
+        duplicates = metrics.duplicates(self.duplicate_threshold)
+        if duplicates:
+            timings.append(('dup', 0, f'{len(duplicates)} repeated queries (N+1?)'))
+        return timings
+
+    def record(self, request, response, metrics, total):
+        duplicates = [
+            {'sql': sql[:MONITORING_SQL_LENGTH], 'count': count}
+            for sql, count in metrics.duplicates(self.duplicate_threshold)
+        ]
+        entry = {
+            'route': route_name(request),
+            'method': request.method,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 2),
+            'sql_ms': round(metrics.sql_seconds * 1000, 2),
+            'sql_count': metrics.sql_count,
+            'template_ms': round(metrics.template_seconds * 1000, 2),
+            'duplicate_queries': duplicates,
+        }
+        logger.info(json.dumps(entry), extra={'request_timing': entry})
+        try:
+            RequestTiming.objects.create(**entry)
+        except DatabaseError:
+            logger.exception("Could not store the request timing")
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.15 on 2026-10-18 18:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestTiming',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('route', models.CharField(max_length=200)),
+                ('method', models.CharField(max_length=10)),
+                ('status', models.PositiveSmallIntegerField()),
+                ('total_ms', models.FloatField()),
+                ('sql_ms', models.FloatField()),
+                ('sql_count', models.PositiveIntegerField()),
+                ('template_ms', models.FloatField()),
+                ('duplicate_queries', models.JSONField(blank=True, default=list)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['created', 'route'], name='request_timing_created_idx')],
+            },
+        ),
+    ]
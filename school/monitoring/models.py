@@ -0,0 +1,24 @@
+from django.db import models
+
+
+class RequestTiming(models.Model):
+    """One sampled request, as measured by monitoring.middleware.PerformanceMiddleware."""
+    created = models.DateTimeField(auto_now_add=True)
+    route = models.CharField(max_length=200)  # URL name, e.g. 'news_detail' or 'admin:students_student_changelist'
+    method = models.CharField(max_length=10)
+    status = models.PositiveSmallIntegerField()
+    total_ms = models.FloatField()
+    sql_ms = models.FloatField()
+    sql_count = models.PositiveIntegerField()
+    template_ms = models.FloatField()
+    # Queries run more often than MONITORING_DUPLICATE_THRESHOLD times, i.e. probable N+1 loops
+    duplicate_queries = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        indexes = [
+            # The percentile view reads recent requests route by route
+            models.Index(fields=['created', 'route'], name='request_timing_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.method} {self.route} {self.total_ms:.1f} ms"
@@ -0,0 +1,57 @@
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth.models import User
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from news.models import News
+
+from .instrumentation import RequestMetrics
+from .middleware import PerformanceMiddleware
+from .models import RequestTiming
+
+
+@override_settings(MONITORING_SAMPLE_RATE=1, MONITORING_SERVER_TIMING_ALWAYS=False)
+class PerformanceMiddlewareTests(TestCase):
+    def test_sampled_request_is_timed_and_stored(self):
+        response = self.client.get('/news/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('sql;dur=', response.headers['Server-Timing'])
+        self.assertIn('total;dur=', response.headers['Server-Timing'])
+        timing = RequestTiming.objects.get()
+        self.assertEqual(timing.route, 'news_archive')
+        self.assertGreater(timing.sql_count, 0)
+        self.assertGreater(timing.template_ms, 0)
+
+    async def test_async_request_is_timed_without_leaving_the_event_loop(self):
+        async def view(request):
+            return HttpResponse(str(await News.objects.acount()))
+
+        middleware = PerformanceMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = await middleware(RequestFactory().get('/news/'))
+        self.assertIn('sql;dur=', response.headers['Server-Timing'])
+        timing = await RequestTiming.objects.aget()
+        self.assertEqual(timing.sql_count, 1)
+
+    def test_repeated_queries_are_reported(self):
+        metrics = RequestMetrics()
+        with connection.execute_wrapper(metrics):
+            for news in News.objects.bulk_create(News(title=f'News {n}', content='Text') for n in range(3)):
+                News.objects.filter(pk=news.pk).exists()
+        [(sql, count)] = metrics.duplicates(3)
+        self.assertIn('news_news', sql)
+        self.assertEqual(count, 3)
+
+    @override_settings(MONITORING_SAMPLE_RATE=0)
+    def test_unsampled_request_is_not_measured(self):
+        response = self.client.get('/news/')
+        self.assertNotIn('Server-Timing', response.headers)
+        self.assertFalse(RequestTiming.objects.exists())
+
+    def test_admin_percentiles(self):
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.get('/news/')
+        self.client.force_login(admin)
+        response = self.client.get('/admin/monitoring/requesttiming/percentiles/')
+        self.assertContains(response, 'news_archive')
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from .models import News, Announcement
+from .search import SearchResults
 
 @admin.register(News)
 class NewsAdmin(admin.ModelAdmin):
@@ -8,9 +9,21 @@ class NewsAdmin(admin.ModelAdmin):
     list_filter = ('time',)
     fields = ('title', 'time', 'image', 'content')  # Include content in admin form
 
+    # Search title and content through the full-text index
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return queryset.filter(pk__in=SearchResults(search_term, 'news').ids()), False
+
 @admin.register(Announcement)
 class AnnouncementAdmin(admin.ModelAdmin):
     list_display = ('title', 'time')
     search_fields = ('title',)
     list_filter = ('time',)
     fields = ('title', 'time', 'content')  # Include content in admin form
+
+    # Search title and content through the full-text index
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return queryset.filter(pk__in=SearchResults(search_term, 'announcement').ids()), False
@@ -0,0 +1,124 @@
+import functools
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max
+from django.template.loader import render_to_string
+
+from .models import News, Announcement
+
+# Seconds a homepage block is considered fresh
+HOMEPAGE_CACHE_TIMEOUT = getattr(settings, 'HOMEPAGE_CACHE_TIMEOUT', 5 * 60)
+
+# Keep serving the previous copy while a single worker rebuilds an expired block
+HOMEPAGE_STALE_WHILE_REVALIDATE = getattr(settings, 'HOMEPAGE_STALE_WHILE_REVALIDATE', True)
+
+# Upper bound for a rebuild; after this another worker may try again
+REBUILD_LOCK_TIMEOUT = 30
+
+# Number of items shown in each homepage block
+HOMEPAGE_ITEMS = 4
+
+FRAGMENT_KEYS = {
+    'latest_news_cards': 'homepage:fragment:latest_news_cards',
+    'latest_news_list': 'homepage:fragment:latest_news_list',
+    'latest_announcements_list': 'homepage:fragment:latest_announcements_list',
+}
+HOMEPAGE_KEYS = list(FRAGMENT_KEYS.values())
+
+
+def _cached(key, build):
+    """
+    Return the cached value for `key`, calling `build()` when it is missing
+    or expired. Entries are stored as (value, fresh_until) so an expired
+    copy can still be served while one worker holds the rebuild lock.
+    """
+    entry = cache.get(key)
+    now = time.time()
+    locked = False
+    if entry is not None:
+        value, fresh_until = entry
+        if now < fresh_until:
+            return value
+        if HOMEPAGE_STALE_WHILE_REVALIDATE:
+            locked = cache.add(f'{key}:lock', True, REBUILD_LOCK_TIMEOUT)
+            if not locked:
+                # Someone else is rebuilding, the stale copy will do
+                return value
+
+    try:
+        value = build()
+        # With stale-while-revalidate the entry outlives its freshness and is replaced, not dropped
+        cache.set(key, (value, now + HOMEPAGE_CACHE_TIMEOUT),
+                  None if HOMEPAGE_STALE_WHILE_REVALIDATE else HOMEPAGE_CACHE_TIMEOUT)
+    finally:
+        if locked:
+            cache.delete(f'{key}:lock')
+    return value
+
+
+def homepage_fragments():
+    """
+    Rendered HTML for the news and announcement blocks of the homepage.
+    A fragment being rebuilt always reads fresh data, so it never caches
+    a stale list as fresh; the two news blocks share one query.
+    """
+    latest_news = functools.cache(lambda: list(News.objects.order_by('-time')[:HOMEPAGE_ITEMS]))
+    return {
+        'latest_news_cards': _cached(
+            FRAGMENT_KEYS['latest_news_cards'],
+            lambda: render_to_string('partials/latest_news_cards.html', {'latest_news': latest_news()}),
+        ),
+        'latest_news_list': _cached(
+            FRAGMENT_KEYS['latest_news_list'],
+            lambda: render_to_string('partials/latest_news_list.html', {'latest_news': latest_news()}),
+        ),
+        'latest_announcements_list': _cached(
+            FRAGMENT_KEYS['latest_announcements_list'],
+            lambda: render_to_string('partials/latest_announcements_list.html', {
+                'latest_announcements': list(Announcement.objects.order_by('-time')[:HOMEPAGE_ITEMS]),
+            }),
+        ),
+    }
+
+
+def news_version():
+    """
+    (last change as a Unix timestamp, version) of the news and
+    announcements, which every public page shows in some form; they validate
+    those pages for conditional GETs. Read from the database, so every
+    worker agrees; the row counts make deletions change the version too.
+    """
+    changed, parts = 0, []
+    for model in (News, Announcement):
+        state = model.objects.aggregate(updated=Max('updated'), count=Count('pk'))
+        updated = state['updated'].timestamp() if state['updated'] else 0
+        changed = max(changed, updated)
+        parts.append(f"{updated}:{state['count']}")
+    return int(changed), '-'.join(parts)
+
+
+def request_news_version(request):
+    # Read once per request, for both the validators and the fragment keys
+    if not hasattr(request, '_news_version'):
+        request._news_version = news_version()
+    return request._news_version
+
+
+def invalidate_homepage():
+    # After commit: before it, a concurrent request could rebuild the blocks
+    # from the old rows and keep them as current
+    transaction.on_commit(_expire_homepage)
+
+
+def _expire_homepage():
+    if not HOMEPAGE_STALE_WHILE_REVALIDATE:
+        cache.delete_many(HOMEPAGE_KEYS)
+        return
+
+    # Mark the entries as expired but keep them, so readers get the old copy
+    # until the next request has rebuilt them
+    entries = cache.get_many(HOMEPAGE_KEYS)
+    cache.set_many({key: (value, 0) for key, (value, fresh_until) in entries.items()}, None)
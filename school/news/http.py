@@ -0,0 +1,86 @@
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .cache import request_news_version
+from .models import News, Announcement
+
+# Seconds browsers and shared caches may reuse a page shown to anonymous visitors without revalidating
+PUBLIC_PAGE_MAX_AGE = getattr(settings, 'PUBLIC_PAGE_MAX_AGE', 60)
+
+
+def news_key(news_id):
+    updated = News.objects.filter(pk=news_id).values_list('updated', flat=True).first()
+    return None if updated is None else f'news-{news_id}-{updated.timestamp()}'
+
+
+def announcement_key(announcement_id):
+    updated = Announcement.objects.filter(pk=announcement_id).values_list('updated', flat=True).first()
+    return None if updated is None else f'announcement-{announcement_id}-{updated.timestamp()}'
+
+
+def homepage_key():
+    return 'index'
+
+
+def _validators(request, page_key, authenticated, args, kwargs):
+    key = page_key(*args, **kwargs)
+    if key is None:
+        return None
+    changed, version = request_news_version(request)
+    # The navbar differs for logged-in users, so they get their own ETag
+    etag = hashlib.md5(f'{key}|{version}|{authenticated}'.encode(), usedforsecurity=False).hexdigest()
+    return quote_etag(etag), changed
+
+
+def _respond(request, validators, response, authenticated):
+    if validators is None or request.method not in ('GET', 'HEAD'):
+        return response
+    etag, changed = validators
+    if response.status_code in (200, 304):
+        response.headers.setdefault('ETag', etag)
+        response.headers.setdefault('Last-Modified', http_date(changed))
+        if authenticated:
+            patch_cache_control(response, private=True, no_cache=True)
+        else:
+            patch_cache_control(response, public=True, max_age=PUBLIC_PAGE_MAX_AGE)
+    # Anonymous and logged-in visitors see different navbars
+    patch_vary_headers(response, ['Cookie'])
+    return response
+
+
+def public_page(page_key):
+    """
+    Answer conditional GETs of a public page before it is rendered.
+    `page_key(*view_args)` identifies the content shown, cheaply, or
+    returns None when it does not exist; combined with the last news change
+    and the login state it gives the ETag, and the last change is the
+    Last-Modified. Works on sync and async views.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            async def wrapper(request, *args, **kwargs):
+                user = await request.auser()
+                validators = await sync_to_async(_validators)(request, page_key, user.is_authenticated, args, kwargs)
+                response = None
+                if validators is not None:
+                    response = get_conditional_response(request, etag=validators[0], last_modified=validators[1])
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                return _respond(request, validators, response, user.is_authenticated)
+        else:
+            def wrapper(request, *args, **kwargs):
+                authenticated = request.user.is_authenticated
+                validators = _validators(request, page_key, authenticated, args, kwargs)
+                response = None
+                if validators is not None:
+                    response = get_conditional_response(request, etag=validators[0], last_modified=validators[1])
+                if response is None:
+                    response = view(request, *args, **kwargs)
+                return _respond(request, validators, response, authenticated)
+        return wraps(view)(wrapper)
+    return decorator
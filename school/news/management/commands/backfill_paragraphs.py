@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from news.models import News, Announcement
+from news.utils import split_paragraphs
+
+
+class Command(BaseCommand):
+    help = 'Pre-compute the paragraphs of existing News and Announcement rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        for model in (News, Announcement):
+            batch = []
+            updated = 0
+            for item in model.objects.only('id', 'content').iterator(chunk_size=batch_size):
+                item.paragraphs = split_paragraphs(item.content)
+                batch.append(item)
+                if len(batch) == batch_size:
+                    updated += model.objects.bulk_update(batch, ['paragraphs'])
+                    batch = []
+            if batch:
+                updated += model.objects.bulk_update(batch, ['paragraphs'])
+            self.stdout.write(self.style.SUCCESS(f"{model.__name__}: {updated} row(s) updated"))
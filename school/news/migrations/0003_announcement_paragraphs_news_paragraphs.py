@@ -0,0 +1,43 @@
+# Generated by Django 5.1.15 on 2026-10-18 18:36
+
+from django.db import migrations, models
+
+from news.utils import split_paragraphs
+
+BATCH_SIZE = 500
+
+
+def fill_paragraphs(apps, schema_editor):
+    # The views only read the stored paragraphs, so existing rows need them too
+    db_alias = schema_editor.connection.alias
+    for model_name in ('News', 'Announcement'):
+        model = apps.get_model('news', model_name)
+        batch = []
+        for item in model.objects.using(db_alias).only('id', 'content').iterator(chunk_size=BATCH_SIZE):
+            item.paragraphs = split_paragraphs(item.content)
+            batch.append(item)
+            if len(batch) == BATCH_SIZE:
+                model.objects.using(db_alias).bulk_update(batch, ['paragraphs'])
+                batch = []
+        model.objects.using(db_alias).bulk_update(batch, ['paragraphs'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0002_announcement_content_news_content'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='announcement',
+            name='paragraphs',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='paragraphs',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.RunPython(fill_paragraphs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.15 on 2026-10-18 18:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0003_announcement_paragraphs_news_paragraphs'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='announcement',
+            index=models.Index(fields=['-time'], name='announcement_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(fields=['-time'], name='news_time_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    from news.search import get_backend
+
+    # Databases without a full-text backend fall back to LIKE queries
+    backend = get_backend(schema_editor.connection)
+    if backend is None:
+        return
+    for statement in backend.create_table_sql():
+        schema_editor.execute(statement)
+
+    # Index the rows that already exist
+    with schema_editor.connection.cursor() as cursor:
+        for kind, model_name in (('news', 'News'), ('announcement', 'Announcement')):
+            model = apps.get_model('news', model_name)
+            rows = model.objects.using(schema_editor.connection.alias).values_list('pk', 'title', 'content')
+            for object_id, title, content in rows.iterator():
+                backend.upsert(cursor, kind, object_id, title, content)
+
+
+def drop_search_index(apps, schema_editor):
+    from news.search import get_backend
+
+    backend = get_backend(schema_editor.connection)
+    if backend is None:
+        return
+    for statement in backend.drop_table_sql():
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0004_news_time_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
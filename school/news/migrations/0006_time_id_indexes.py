@@ -0,0 +1,29 @@
+# Generated by Django 5.1.15 on 2026-10-18 18:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0005_search_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='announcement',
+            name='announcement_time_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='news',
+            name='news_time_idx',
+        ),
+        migrations.AddIndex(
+            model_name='announcement',
+            index=models.Index(fields=['-time', '-id'], name='announcement_time_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(fields=['-time', '-id'], name='news_time_id_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.15 on 2026-10-18 19:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0006_time_id_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='announcement',
+            name='updated',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='updated',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
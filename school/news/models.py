@@ -3,6 +3,7 @@ import os
 from django.db import models
 from django.utils import timezone
 from django.conf import settings
+from .utils import split_paragraphs
 
 def news_image_upload_to(instance, filename):
     return os.path.join('news_images', f'{instance.id}_{filename}')
@@ -12,13 +13,21 @@ class News(models.Model):
     time = models.DateTimeField(default=timezone.now)
     image = models.ImageField(upload_to='news_images/', blank=True, null=True)  # Image field for news
     content = models.TextField()  # Field for news content
+    paragraphs = models.JSONField(default=list, blank=True, editable=False)  # Content split once on save
+    updated = models.DateTimeField(auto_now=True, db_index=True)  # Validates cached pages showing it
     
     def save(self, *args, **kwargs):
+        self.paragraphs = split_paragraphs(self.content)
         # Ensure the image path is updated with the correct ID after saving
         if self.id and self.image:
             self.image.name = news_image_upload_to(self, self.image.name)
         super().save(*args, **kwargs)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-time', '-id'], name='news_time_id_idx'),  # Latest news first, archive cursors
+        ]
+
     def __str__(self):
         return self.title
 
@@ -26,6 +35,17 @@ class Announcement(models.Model):
     title = models.CharField(max_length=200)
     time = models.DateTimeField(default=timezone.now)
     content = models.TextField()  # Field for announcement content
+    paragraphs = models.JSONField(default=list, blank=True, editable=False)  # Content split once on save
+    updated = models.DateTimeField(auto_now=True, db_index=True)  # Validates cached pages showing it
+
+    def save(self, *args, **kwargs):
+        self.paragraphs = split_paragraphs(self.content)
+        super().save(*args, **kwargs)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-time', '-id'], name='announcement_time_id_idx'),  # Latest first, archive cursors
+        ]
 
     def __str__(self):
         return self.title
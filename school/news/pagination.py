@@ -0,0 +1,70 @@
+import datetime
+
+from django.db.models import Q
+
+# Items per archive page
+ARCHIVE_PAGE_SIZE = 12
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+def make_cursor(item):
+    # "<microseconds since epoch>.<id>", stable and URL safe
+    return f"{(item.time - EPOCH) // MICROSECOND}.{item.pk}"
+
+
+def parse_cursor(cursor):
+    try:
+        microseconds, pk = cursor.split('.')
+        moment = EPOCH + int(microseconds) * MICROSECOND
+        return moment, int(pk)
+    except (AttributeError, ValueError, OverflowError, OSError):
+        return None
+
+
+class KeysetPage:
+    def __init__(self, items, older, newer):
+        self.items = items
+        self.older_cursor = older
+        self.newer_cursor = newer
+
+
+def keyset_page(queryset, before=None, after=None, size=ARCHIVE_PAGE_SIZE):
+    """
+    Return one page of `queryset` ordered newest first by (time, id).
+
+    Pages are addressed by the cursor of an edge item instead of an offset:
+    `before` returns the items older than the cursor, `after` the items newer
+    than it. Each page is a single index range scan, so page 500 costs the
+    same as page 1. Invalid cursors fall back to the first page.
+    """
+    before = parse_cursor(before) if before else None
+    after = parse_cursor(after) if after else None
+
+    if after:
+        moment, pk = after
+        # time >= t narrows the index range, the OR only breaks ties
+        rows = list(
+            queryset.filter(Q(time__gte=moment) & (Q(time__gt=moment) | Q(pk__gt=pk)))
+            .order_by('time', 'pk')[:size + 1]
+        )
+        has_newer = len(rows) > size
+        items = rows[:size][::-1]
+        has_older = True
+    else:
+        if before:
+            moment, pk = before
+            queryset = queryset.filter(Q(time__lte=moment) & (Q(time__lt=moment) | Q(pk__lt=pk)))
+        rows = list(queryset.order_by('-time', '-pk')[:size + 1])
+        has_older = len(rows) > size
+        items = rows[:size]
+        has_newer = before is not None
+
+    if not items:
+        return KeysetPage([], None, None)
+    return KeysetPage(
+        items,
+        make_cursor(items[-1]) if has_older else None,
+        make_cursor(items[0]) if has_newer else None,
+    )
@@ -0,0 +1,247 @@
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.models import Q
+
+from .models import News, Announcement
+
+# Table holding the full-text index of news and announcements
+SEARCH_TABLE = 'news_search'
+
+# Searchable models by the `kind` stored in the index
+SEARCH_MODELS = {
+    'news': News,
+    'announcement': Announcement,
+}
+
+
+def document_id(kind, object_id):
+    # News and announcements share one index, so give each its own id space
+    return object_id * 2 + (1 if kind == 'announcement' else 0)
+
+
+def kind_of(instance):
+    return 'announcement' if isinstance(instance, Announcement) else 'news'
+
+
+class SQLiteBackend:
+    """SQLite FTS5 index ranked with bm25, titles weigh ten times the content."""
+
+    @staticmethod
+    def create_table_sql():
+        return [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+            "kind UNINDEXED, object_id UNINDEXED, title, content, tokenize = 'porter unicode61')",
+        ]
+
+    @staticmethod
+    def drop_table_sql():
+        return [f"DROP TABLE IF EXISTS {SEARCH_TABLE}"]
+
+    @staticmethod
+    def match_query(terms):
+        # Every word must match; the last one may be a prefix of a longer word
+        quoted = [f'"{term}"' for term in terms]
+        quoted[-1] += '*'
+        return ' '.join(quoted)
+
+    def upsert(self, cursor, kind, object_id, title, content):
+        rowid = document_id(kind, object_id)
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [rowid])
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, kind, object_id, title, content) VALUES (%s, %s, %s, %s, %s)",
+            [rowid, kind, object_id, title, content],
+        )
+
+    def delete(self, cursor, kind, object_id):
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [document_id(kind, object_id)])
+
+    def search(self, cursor, terms, kind, limit, offset):
+        where, params = self._where(terms, kind)
+        cursor.execute(
+            f"SELECT kind, object_id FROM {SEARCH_TABLE} WHERE {where} "
+            f"ORDER BY bm25({SEARCH_TABLE}, 0, 0, 10.0, 1.0) LIMIT %s OFFSET %s",
+            params + [limit, offset],
+        )
+        return cursor.fetchall()
+
+    def count(self, cursor, terms, kind):
+        where, params = self._where(terms, kind)
+        cursor.execute(f"SELECT COUNT(*) FROM {SEARCH_TABLE} WHERE {where}", params)
+        return cursor.fetchone()[0]
+
+    def _where(self, terms, kind):
+        where, params = f"{SEARCH_TABLE} MATCH %s", [self.match_query(terms)]
+        if kind:
+            where += " AND kind = %s"
+            params.append(kind)
+        return where, params
+
+
+class PostgresBackend:
+    """A tsvector column with a GIN index, ranked with ts_rank_cd."""
+
+    @staticmethod
+    def create_table_sql():
+        return [
+            f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+            "id bigint PRIMARY KEY, kind varchar(20) NOT NULL, object_id bigint NOT NULL, document tsvector NOT NULL)",
+            f"CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_document_idx ON {SEARCH_TABLE} USING GIN (document)",
+        ]
+
+    @staticmethod
+    def drop_table_sql():
+        return [f"DROP TABLE IF EXISTS {SEARCH_TABLE}"]
+
+    @staticmethod
+    def match_query(terms):
+        # to_tsquery syntax: all words, prefix match on the last one
+        quoted = [re.sub(r"[^\w]", '', term) for term in terms]
+        quoted[-1] += ':*'
+        return ' & '.join(quoted)
+
+    def upsert(self, cursor, kind, object_id, title, content):
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} (id, kind, object_id, document) VALUES (%s, %s, %s, "
+            "setweight(to_tsvector('english', %s), 'A') || setweight(to_tsvector('english', %s), 'B')) "
+            "ON CONFLICT (id) DO UPDATE SET document = EXCLUDED.document",
+            [document_id(kind, object_id), kind, object_id, title, content],
+        )
+
+    def delete(self, cursor, kind, object_id):
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE id = %s", [document_id(kind, object_id)])
+
+    def search(self, cursor, terms, kind, limit, offset):
+        where, params = self._where(terms, kind)
+        cursor.execute(
+            f"SELECT kind, object_id FROM {SEARCH_TABLE} WHERE {where} "
+            "ORDER BY ts_rank_cd(document, to_tsquery('english', %s)) DESC, id DESC LIMIT %s OFFSET %s",
+            params + [self.match_query(terms), limit, offset],
+        )
+        return cursor.fetchall()
+
+    def count(self, cursor, terms, kind):
+        where, params = self._where(terms, kind)
+        cursor.execute(f"SELECT COUNT(*) FROM {SEARCH_TABLE} WHERE {where}", params)
+        return cursor.fetchone()[0]
+
+    def _where(self, terms, kind):
+        where, params = "document @@ to_tsquery('english', %s)", [self.match_query(terms)]
+        if kind:
+            where += " AND kind = %s"
+            params.append(kind)
+        return where, params
+
+
+BACKENDS = {
+    'sqlite': SQLiteBackend,
+    'postgresql': PostgresBackend,
+}
+
+
+def get_backend(db_connection=connection):
+    backend = BACKENDS.get(db_connection.vendor)
+    return backend() if backend else None
+
+
+def search_terms(query):
+    return re.findall(r'\w+', query or '')
+
+
+def index_document(instance, using=DEFAULT_DB_ALIAS):
+    db_connection = connections[using]
+    backend = get_backend(db_connection)
+    if backend:
+        with db_connection.cursor() as cursor:
+            backend.upsert(cursor, kind_of(instance), instance.pk, instance.title, instance.content)
+
+
+def remove_document(instance, using=DEFAULT_DB_ALIAS):
+    db_connection = connections[using]
+    backend = get_backend(db_connection)
+    if backend:
+        with db_connection.cursor() as cursor:
+            backend.delete(cursor, kind_of(instance), instance.pk)
+
+
+def rebuild_index(batch_size=500, using=DEFAULT_DB_ALIAS):
+    db_connection = connections[using]
+    backend = get_backend(db_connection)
+    if not backend:
+        return 0
+    indexed = 0
+    with db_connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        for kind, model in SEARCH_MODELS.items():
+            rows = model.objects.using(using).values_list('pk', 'title', 'content').iterator(chunk_size=batch_size)
+            for object_id, title, content in rows:
+                backend.upsert(cursor, kind, object_id, title, content)
+                indexed += 1
+    return indexed
+
+
+class SearchResults:
+    """
+    Lazily evaluated, ranked search results that Django's Paginator can
+    slice: only the requested page is read from the index.
+    """
+
+    def __init__(self, query, kind=None):
+        self.terms = search_terms(query)
+        self.kind = kind
+        self.backend = get_backend()
+
+    def count(self):
+        if not self.terms:
+            return 0
+        if not self.backend:
+            return sum(self._fallback(model).count() for model in self._models())
+        with connection.cursor() as cursor:
+            return self.backend.count(cursor, self.terms, self.kind)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, page):
+        """Return (kind, item) pairs for a slice of the ranked results."""
+        if not self.terms:
+            return []
+        if not self.backend:
+            # Databases without a full-text index: unranked, newest first
+            items = [
+                (kind, item) for kind, model in SEARCH_MODELS.items() if model in self._models()
+                for item in self._fallback(model).order_by('-time')
+            ]
+            return items[page]
+
+        offset = page.start or 0
+        limit = (page.stop or offset) - offset
+        with connection.cursor() as cursor:
+            rows = self.backend.search(cursor, self.terms, self.kind, limit, offset)
+
+        # One query per kind to load the matching items, then restore rank order
+        loaded = {
+            kind: SEARCH_MODELS[kind].objects.in_bulk([object_id for row_kind, object_id in rows if row_kind == kind])
+            for kind in {row_kind for row_kind, object_id in rows}
+        }
+        return [(kind, loaded[kind][object_id]) for kind, object_id in rows if object_id in loaded[kind]]
+
+    def ids(self):
+        """Primary keys of every match of `kind`, used to filter admin changelists."""
+        if not self.terms:
+            return []
+        if not self.backend:
+            return list(self._fallback(SEARCH_MODELS[self.kind]).values_list('pk', flat=True))
+        with connection.cursor() as cursor:
+            total = self.backend.count(cursor, self.terms, self.kind)
+            rows = self.backend.search(cursor, self.terms, self.kind, total, 0)
+        return [object_id for kind, object_id in rows]
+
+    def _models(self):
+        return [SEARCH_MODELS[self.kind]] if self.kind else list(SEARCH_MODELS.values())
+
+    def _fallback(self, model):
+        queryset = model.objects.all()
+        for term in self.terms:
+            queryset = queryset.filter(Q(title__icontains=term) | Q(content__icontains=term))
+        return queryset
@@ -0,0 +1,32 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_homepage
+from .models import News, Announcement
+from .search import index_document, remove_document
+from students.images import schedule_variants
+
+
+@receiver([post_save, post_delete], sender=News)
+@receiver([post_save, post_delete], sender=Announcement)
+def news_changed(sender, instance, **kwargs):
+    invalidate_homepage()
+
+
+@receiver(post_save, sender=News)
+def news_image_uploaded(sender, instance, **kwargs):
+    # The homepage cards switch to the resized variants once they exist
+    schedule_variants(instance.image, callback=invalidate_homepage)
+
+
+@receiver(post_save, sender=News)
+@receiver(post_save, sender=Announcement)
+def update_search_index(sender, instance, using, **kwargs):
+    # The index lives next to the rows, on the database the instance was saved to
+    index_document(instance, using)
+
+
+@receiver(post_delete, sender=News)
+@receiver(post_delete, sender=Announcement)
+def remove_from_search_index(sender, instance, using, **kwargs):
+    remove_document(instance, using)
@@ -1,3 +1,281 @@
-from django.test import TestCase
+import datetime
+import importlib
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+
+from students import async_views
+from students.tests import QueryPlanMixin
+
+from .cache import homepage_fragments
+from .models import Announcement, News
+from .pagination import keyset_page, make_cursor
+from .search import PostgresBackend, SearchResults
+
+
+class HotQueryIndexTests(QueryPlanMixin, TestCase):
+    def test_latest_news(self):
+        self.assertUsesIndex(News.objects.order_by('-time')[:4])
+
+    def test_latest_news_excluding_current(self):
+        self.assertUsesIndex(News.objects.exclude(id=1).order_by('-time')[:4])
+
+    def test_latest_announcements(self):
+        self.assertUsesIndex(Announcement.objects.order_by('-time')[:4])
+
+
+class ParagraphMigrationTests(TestCase):
+    def test_existing_rows_get_their_paragraphs(self):
+        # Rows written before the paragraphs field existed hold the field default
+        News.objects.bulk_create([News(title='Old', content='First line.\nSecond line.', paragraphs=[])])
+        Announcement.objects.bulk_create([Announcement(title='Old', content='One. Two.', paragraphs=[])])
+        migration = importlib.import_module('news.migrations.0003_announcement_paragraphs_news_paragraphs')
+        migration.fill_paragraphs(apps, mock.Mock(connection=connection))
+        self.assertEqual(News.objects.get().paragraphs, ['First line.', 'Second line.'])
+        self.assertEqual(Announcement.objects.get().paragraphs, ['One.', 'Two.'])
+
+
+class SearchTests(TestCase):
+    """Runs against the full-text backend of the test database: FTS5 on SQLite, tsvector on PostgreSQL."""
+
+    def setUp(self):
+        self.results = News.objects.create(title='Examination results', content='The results are out.')
+        self.sports = News.objects.create(title='Sports day', content='Examination of the results comes later.')
+        self.holiday = Announcement.objects.create(title='Holiday', content='School resumes after the examination.')
+
+    def search(self, query, kind=None):
+        return [item for kind, item in SearchResults(query, kind)[0:10]]
+
+    def test_every_word_must_match_and_titles_rank_first(self):
+        self.assertEqual(self.search('examination results'), [self.results, self.sports])
+
+    def test_last_word_matches_as_prefix(self):
+        self.assertEqual(self.search('spor'), [self.sports])
+        self.assertEqual(self.search('spor day'), [])
+
+    def test_kind_filter_and_count(self):
+        self.assertEqual(SearchResults('examination').count(), 3)
+        self.assertEqual(self.search('examination', 'announcement'), [self.holiday])
+        self.assertEqual(SearchResults('examination', 'news').ids(), [self.results.pk, self.sports.pk])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.sports.title = 'Football match'
+        self.sports.content = 'Kick off at noon.'
+        self.sports.save()
+        self.assertEqual(self.search('football'), [self.sports])
+        self.assertEqual(self.search('examination', 'news'), [self.results])
+        self.results.delete()
+        self.assertEqual(self.search('examination', 'news'), [])
+
+    def test_query_syntax_is_not_passed_through(self):
+        # Quotes and operators are not query syntax: only the words are searched for, "OR" included
+        self.assertEqual(self.search('"sports" OR -day*'), [])
+        self.assertEqual(self.search('sports" day'), [self.sports])
+        self.assertEqual(self.search('  '), [])
+        self.assertEqual(SearchResults('').count(), 0)
+
+    def test_search_page(self):
+        response = self.client.get('/search/', {'q': 'holiday'})
+        self.assertEqual(response.context['page_obj'].paginator.count, 1)
+        self.assertContains(response, 'Holiday')
+
+    def test_databases_without_full_text_search(self):
+        with mock.patch('news.search.get_backend', return_value=None):
+            self.assertEqual(SearchResults('examination results').count(), 2)
+            self.assertEqual({item for kind, item in SearchResults('examination results')[0:10]},
+                             {self.results, self.sports})
+
+
+class PostgresSearchBackendTests(TestCase):
+    def test_match_query(self):
+        self.assertEqual(PostgresBackend.match_query(['examination', 'res']), 'examination & res:*')
+
+    def test_search_sql(self):
+        cursor = mock.Mock()
+        PostgresBackend().search(cursor, ['sports', 'da'], 'news', 10, 20)
+        sql, params = cursor.execute.call_args.args
+        self.assertIn("document @@ to_tsquery('english', %s) AND kind = %s", sql)
+        self.assertIn('ORDER BY ts_rank_cd', sql)
+        self.assertEqual(params, ['sports & da:*', 'news', 'sports & da:*', 10, 20])
+
+    def test_titles_weigh_more(self):
+        cursor = mock.Mock()
+        PostgresBackend().upsert(cursor, 'announcement', 3, 'Holiday', 'School resumes')
+        sql, params = cursor.execute.call_args.args
+        self.assertIn("setweight(to_tsvector('english', %s), 'A')", sql)
+        self.assertEqual(params, [7, 'announcement', 3, 'Holiday', 'School resumes'])
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        # Seven items, five of them sharing one time, so pages must break ties by id
+        moment = timezone.now()
+        times = [moment] * 5 + [moment - datetime.timedelta(hours=1), moment + datetime.timedelta(hours=1)]
+        News.objects.bulk_create(News(title=f'News {n}', content='-', time=time) for n, time in enumerate(times))
+        self.ordered = list(News.objects.order_by('-time', '-pk'))
+
+    def walk_older(self):
+        pages = [keyset_page(News.objects.all(), size=3)]
+        while pages[-1].older_cursor:
+            pages.append(keyset_page(News.objects.all(), before=pages[-1].older_cursor, size=3))
+        return pages
+
+    def test_older_pages_cover_every_item_once(self):
+        pages = self.walk_older()
+        self.assertEqual([len(page.items) for page in pages], [3, 3, 1])
+        self.assertEqual([item for page in pages for item in page.items], self.ordered)
+        self.assertIsNone(pages[0].newer_cursor)
+        self.assertIsNone(pages[-1].older_cursor)
+
+    def test_newer_pages_lead_back_to_the_first(self):
+        pages = self.walk_older()
+        page = pages[-1]
+        walked_back = []
+        while page.newer_cursor:
+            page = keyset_page(News.objects.all(), after=page.newer_cursor, size=3)
+            walked_back.append(page.items)
+        self.assertEqual(walked_back, [pages[1].items, pages[0].items])
+        self.assertIsNone(page.newer_cursor)
+        self.assertIsNotNone(page.older_cursor)
+
+    def test_invalid_cursor_gives_the_first_page(self):
+        for cursor in ('garbage', '1.2.3', '99999999999999999999999.1'):
+            self.assertEqual(keyset_page(News.objects.all(), before=cursor, size=3).items, self.ordered[:3])
+
+    def test_archive_view(self):
+        response = self.client.get('/news/')
+        self.assertEqual(len(response.context['page'].items), 7)
+        response = self.client.get('/news/', {'before': make_cursor(self.ordered[2])})
+        self.assertEqual(response.context['page'].items, self.ordered[3:])
+        self.assertContains(response, '?after=')
+
+
+class HomepageInvalidationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_blocks_are_expired_only_after_commit(self):
+        News.objects.create(title='Sports day', content='On Friday')
+        self.assertContains(self.client.get('/'), 'Sports day')
+        with self.captureOnCommitCallbacks() as callbacks:
+            News.objects.create(title='Examination results', content='Out now')
+            # Not committed yet: the cached blocks are left as they are
+            self.assertNotContains(self.client.get('/'), 'Examination results')
+        for callback in callbacks:
+            callback()
+        self.assertContains(self.client.get('/'), 'Examination results')
+
+
+class HomepageFragmentTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        News.objects.create(title='Sports day', content='On Friday')
+
+    def test_news_blocks_are_built_from_one_query(self):
+        # Both news blocks and the announcements block
+        with self.assertNumQueries(2):
+            fragments = homepage_fragments()
+        self.assertIn('Sports day', fragments['latest_news_cards'])
+        self.assertIn('Sports day', fragments['latest_news_list'])
+        with self.assertNumQueries(0):
+            homepage_fragments()
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.news = News.objects.create(title='Sports day', content='On Friday')
+
+    def test_repeat_visit_is_not_modified(self):
+        response = self.client.get(f'/news/{self.news.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('public', response.headers['Cache-Control'])
+        self.assertIn('Cookie', response.headers['Vary'])
+
+        repeat = self.client.get(f'/news/{self.news.pk}/', headers={'If-None-Match': response.headers['ETag']})
+        self.assertEqual(repeat.status_code, 304)
+        repeat = self.client.get(f'/news/{self.news.pk}/',
+                                 headers={'If-Modified-Since': response.headers['Last-Modified']})
+        self.assertEqual(repeat.status_code, 304)
+
+    def test_changes_and_login_change_the_etag(self):
+        etag = self.client.get('/').headers['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Announcement.objects.create(title='Holiday', content='Next week')
+        self.assertEqual(self.client.get('/', headers={'If-None-Match': etag}).status_code, 200)
+
+        etag = self.client.get('/').headers['ETag']
+        self.client.force_login(User.objects.create_user('reader', password='x'))
+        response = self.client.get('/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response.headers['Cache-Control'])
+
+    def test_validators_come_from_the_database(self):
+        response = self.client.get(f'/news/{self.news.pk}/')
+        # Another worker, with its own local cache, agrees on them
+        cache.clear()
+        repeat = self.client.get(f'/news/{self.news.pk}/')
+        self.assertEqual(repeat.headers['ETag'], response.headers['ETag'])
+        self.assertEqual(repeat.headers['Last-Modified'], response.headers['Last-Modified'])
+
+    def test_editing_and_deleting_change_the_etag(self):
+        etag = self.client.get(f'/news/{self.news.pk}/').headers['ETag']
+        self.news.content = 'On Saturday'
+        self.news.save()
+        response = self.client.get(f'/news/{self.news.pk}/', headers={'If-None-Match': etag})
+        self.assertContains(response, 'On Saturday')
+
+        other = News.objects.create(title='Examination results', content='Out now')
+        etag = self.client.get('/').headers['ETag']
+        other.delete()
+        self.assertEqual(self.client.get('/', headers={'If-None-Match': etag}).status_code, 200)
+
+    def test_missing_item_is_not_found(self):
+        self.assertEqual(self.client.get('/news/999/', headers={'If-None-Match': '*'}).status_code, 404)
+
+    async def test_async_view(self):
+        async def anonymous():
+            return AnonymousUser()
+
+        def request(**headers):
+            # As prepared by the session and authentication middleware
+            request = RequestFactory().get(f'/news/{self.news.pk}/', headers=headers)
+            request.user, request.auser = AnonymousUser(), anonymous
+            return request
+
+        response = await async_views.news_detail(request(), news_id=self.news.pk)
+        self.assertEqual(response.status_code, 200)
+        response = await async_views.news_detail(request(If_None_Match=response.headers['ETag']), news_id=self.news.pk)
+        self.assertEqual(response.status_code, 304)
+
+
+@override_settings(FRAGMENT_CACHE_TIMEOUT=60)
+class FragmentCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.news = News.objects.create(title='Sports day', content='On Friday')
+
+    def test_sidebar_follows_news_changes(self):
+        self.assertContains(self.client.get(f'/news/{self.news.pk}/'), 'No news available.')
+        with self.captureOnCommitCallbacks(execute=True):
+            News.objects.create(title='Examination results', content='Out now')
+        self.assertContains(self.client.get(f'/news/{self.news.pk}/'), 'Examination results')
+
+    def test_sidebar_follows_changes_made_by_another_worker(self):
+        self.assertContains(self.client.get(f'/news/{self.news.pk}/'), 'No news available.')
+        # Saved elsewhere: no commit callback runs in this process
+        with self.captureOnCommitCallbacks(execute=False):
+            News.objects.create(title='Examination results', content='Out now')
+        self.assertContains(self.client.get(f'/news/{self.news.pk}/'), 'Examination results')
+
+    def test_navbar_is_cached_per_login_state(self):
+        self.assertContains(self.client.get('/about/'), 'Login')
+        self.client.force_login(User.objects.create_user('reader', password='x'))
+        response = self.client.get('/about/')
+        self.assertContains(response, 'Logout')
+        self.assertNotContains(response, 'SingUp')
@@ -0,0 +1,40 @@
+import re
+
+# Words that end with a period without ending the sentence
+ABBREVIATIONS = {
+    'mr', 'mrs', 'ms', 'dr', 'prof', 'engr', 'sen', 'hon', 'st', 'sr', 'jr', 'no', 'vs', 'etc', 'e.g', 'i.e',
+    'jan', 'feb', 'mar', 'apr', 'jun', 'jul', 'aug', 'sep', 'sept', 'oct', 'nov', 'dec',
+}
+
+# A sentence ends at . ! or ? followed by whitespace and a capital letter, digit or opening quote
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+(?=["\'(\[]?[A-Z0-9])')
+
+
+def split_sentences(text):
+    sentences = []
+    start = 0
+    for match in SENTENCE_BOUNDARY.finditer(text):
+        candidate = text[start:match.start()]
+        last_word = candidate.rsplit(None, 1)[-1].rstrip('.!?').lower() if candidate.strip() else ''
+        # Skip "Dr. Musa" and initials like "A. Bello"; decimals never match since no space follows the dot
+        if last_word in ABBREVIATIONS or (len(last_word) == 1 and last_word.isalpha()):
+            continue
+        sentences.append(candidate.strip())
+        start = match.end()
+    sentences.append(text[start:].strip())
+    return [sentence for sentence in sentences if sentence]
+
+
+def split_paragraphs(content):
+    """
+    Split article content into paragraphs for the detail pages.
+    Line breaks written by the author are kept as paragraph breaks; text
+    without any line breaks is split into one paragraph per sentence.
+    """
+    content = (content or '').strip()
+    if not content:
+        return []
+    lines = [line.strip() for line in content.splitlines() if line.strip()]
+    if len(lines) > 1:
+        return lines
+    return split_sentences(content)
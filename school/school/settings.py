@@ -38,10 +38,13 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'students',
     'news',
+    'monitoring',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'school.static.StaticFilesMiddleware',
+    'monitoring.middleware.PerformanceMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -52,36 +55,136 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'school.urls'
 
+# Production template mode: compiled templates stay in memory (school.wsgi
+# and school.asgi compile them all at worker start) and the navbar, footer
+# and news sidebars are cached as fragments. Off while DEBUG so template
+# edits show up at once.
+TEMPLATE_CACHING = not DEBUG
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
          'DIRS': [os.path.join(BASE_DIR, 'templates')],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'school.templating.fragments',
             ],
+            'loaders': (
+                [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)] if TEMPLATE_CACHING
+                else TEMPLATE_LOADERS
+            ),
         },
     },
 ]
 
+# Seconds a cached template fragment is kept; model changes and template
+# changes replace it earlier through its cache key. 0 disables the fragments.
+FRAGMENT_CACHE_TIMEOUT = 24 * 60 * 60 if TEMPLATE_CACHING else 0
+
 WSGI_APPLICATION = 'school.wsgi.application'
 
+# Use the async public views (students.async_views); enable when serving school.asgi
+ASYNC_VIEWS = os.environ.get('SCHOOL_ASYNC_VIEWS') == '1'
+
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
+# Select the database profile with SCHOOL_DB=sqlite (default) or SCHOOL_DB=postgres
+SCHOOL_DB = os.environ.get('SCHOOL_DB', 'sqlite')
+
+if SCHOOL_DB == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'school'),
+            'USER': os.environ.get('POSTGRES_USER', 'school'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            # Keep connections open between requests and check them before reuse
+            'CONN_MAX_AGE': int(os.environ.get('POSTGRES_CONN_MAX_AGE', 600)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
+    }
+    if os.environ.get('POSTGRES_POOL_MAX_SIZE'):
+        # psycopg connection pool (needs psycopg[pool]), replaces persistent connections
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('POSTGRES_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.environ['POSTGRES_POOL_MAX_SIZE']),
+            'timeout': 10,
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            # Reuse the connection, and its pragmas, across requests
+            'CONN_MAX_AGE': 600,
+            'OPTIONS': {
+                # Wait up to 20 seconds for a lock instead of failing with "database is locked"
+                'timeout': 20,
+                # Take the write lock when a transaction starts so it cannot deadlock on upgrade
+                'transaction_mode': 'IMMEDIATE',
+                # Applied on every new connection: readers do not block the writer in WAL mode
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA synchronous=NORMAL;'
+                    'PRAGMA busy_timeout=20000;'
+                    'PRAGMA temp_store=MEMORY;'
+                    'PRAGMA cache_size=-20000;'
+                    'PRAGMA mmap_size=134217728;'
+                ),
+            },
+        }
+    }
+
+# An existing SQLite file to copy from with `manage.py transfer_database`
+if os.environ.get('SCHOOL_LEGACY_SQLITE'):
+    DATABASES['legacy'] = {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ['SCHOOL_LEGACY_SQLITE'],
     }
-}
 
 
+# A cache shared by every worker process; without it each process has its own
+# local memory cache, so nothing another worker must see can be kept there
+SHARED_CACHE = bool(os.environ.get('SCHOOL_REDIS_URL'))
+if SHARED_CACHE:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['SCHOOL_REDIS_URL'],
+        },
+    }
+
+SESSION_SAVE_EVERY_REQUEST = False
+
+if SHARED_CACHE:
+    # Sessions are read from the cache and written to the database in the
+    # background; unchanged sessions are never saved again
+    SESSION_ENGINE = 'students.sessions'
+
+    # Resolves request.user, with its student profile, from the cache
+    AUTHENTICATION_BACKENDS = ['students.auth.CachedModelBackend']
+
+# Measure SQL, template and total time of a sample of requests; sampled
+# requests are logged to 'monitoring.requests' and listed in the admin.
+# With MONITORING_SERVER_TIMING_ALWAYS every response gets Server-Timing.
+MONITORING_SAMPLE_RATE = float(os.environ.get('SCHOOL_MONITORING_SAMPLE_RATE', '0.01'))
+MONITORING_SERVER_TIMING_ALWAYS = DEBUG
+MONITORING_DUPLICATE_THRESHOLD = 5
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -121,11 +224,33 @@ USE_TZ = True
 # static directory
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+
+# collectstatic writes content-hashed, optimized and precompressed copies to
+# STATIC_ROOT; StaticFilesMiddleware serves them with far-future caching
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+            else 'school.storage.CompressedManifestStaticFilesStorage'
+        ),
+    },
+}
 
 #  media derectory
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Let the front proxy send uploaded files once Django has checked access:
+# 'x-accel-redirect' for nginx (with an internal location at
+# MEDIA_ACCEL_REDIRECT_PREFIX aliased to MEDIA_ROOT) or 'x-sendfile' for
+# Apache/lighttpd. Empty streams them from Django.
+MEDIA_OFFLOAD = os.environ.get('SCHOOL_MEDIA_OFFLOAD', '')
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -0,0 +1,146 @@
+import mimetypes
+import os
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+
+# Fingerprinted files never change, so caches may keep them for a year
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Files requested by their original name may change on the next deploy
+DEFAULT_CACHE_CONTROL = 'public, max-age=300'
+
+# Precompressed copies written by CompressedManifestStaticFilesStorage, best first
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def accepted_encodings(header):
+    """
+    Content codings of an Accept-Encoding header mapped to their q-value;
+    codings refused with q=0 are kept, so they win over a `*` entry.
+    """
+    codings = {}
+    for entry in header.split(','):
+        coding, *parameters = [part.strip() for part in entry.split(';')]
+        if not coding:
+            continue
+        quality = 1.0
+        for parameter in parameters:
+            name, _, value = parameter.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        codings[coding.lower()] = quality
+    return codings
+
+
+def choose_encoding(header, available):
+    """The best of `available` codings (server preference order) the client accepts, or None."""
+    codings = accepted_encodings(header)
+    best, best_quality = None, 0.0
+    for coding in available:
+        quality = codings.get(coding, codings.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def file_etag(stat):
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def not_modified(request, etag, last_modified):
+    """True when the request's validators match the file (RFC 9110 order)."""
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match is not None:
+        return etag in [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')] or if_none_match == '*'
+    if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    return if_modified_since is not None and int(last_modified) <= if_modified_since
+
+
+class StaticFilesMiddleware:
+    """
+    Serve collected static files from STATIC_ROOT without going through the
+    URL resolver or any view. Picks the .br/.gz copy that matches
+    Accept-Encoding and marks manifest-hashed files as immutable.
+    Only active when DEBUG is off; runserver serves static files in development.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if settings.DEBUG or not settings.STATIC_ROOT:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL
+        self.root = str(settings.STATIC_ROOT)
+        self.hashed_names = self.load_hashed_names()
+        # Under ASGI, stay async so async views are not run through a thread
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def load_hashed_names():
+        manifest = getattr(staticfiles_storage, 'hashed_files', None)
+        return set(manifest.values()) if manifest else set()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.serve_static(request)
+        if response is not None:
+            return response
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        # A few stat() calls, cheaper than a hop to a thread
+        response = self.serve_static(request)
+        if response is not None:
+            return response
+        return await self.get_response(request)
+
+    def serve_static(self, request):
+        if request.method in ('GET', 'HEAD') and request.path.startswith(self.prefix):
+            return self.serve(request, request.path[len(self.prefix):])
+        return None
+
+    def serve(self, request, name):
+        try:
+            path = safe_join(self.root, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        content_type, _ = mimetypes.guess_type(path)
+        available = {coding: suffix for coding, suffix in ENCODINGS if os.path.isfile(path + suffix)}
+        encoding = choose_encoding(request.headers.get('Accept-Encoding', ''), available)
+        if encoding:
+            path += available[encoding]
+
+        stat = os.stat(path)
+        etag = file_etag(stat)
+        if not_modified(request, etag, stat.st_mtime):
+            response = HttpResponseNotModified()
+        else:
+            response = FileResponse(open(path, 'rb'), content_type=content_type or 'application/octet-stream')
+            del response.headers['Content-Disposition']
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+        response.headers['ETag'] = etag
+        response.headers['Last-Modified'] = http_date(stat.st_mtime)
+        response.headers['Cache-Control'] = (
+            IMMUTABLE_CACHE_CONTROL if name in self.hashed_names else DEFAULT_CACHE_CONTROL
+        )
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
@@ -0,0 +1,96 @@
+import gzip
+import logging
+import os
+import shutil
+import subprocess
+from io import BytesIO
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from PIL import Image
+
+try:
+    import brotli
+except ImportError:  # Brotli copies are optional
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Text assets worth precompressing
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.txt', '.json', '.xml', '.map', '.html')
+
+# Compressed copies that do not save at least this fraction are dropped
+MINIMUM_SAVING = 0.05
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Manifest storage that also, at collectstatic time:
+
+    * optimizes PNG files losslessly with Pillow and JPEG files with
+      jpegtran when it is installed,
+    * writes .gz and (with the brotli package) .br copies of text assets,
+
+    so the static server can send them without any work per request.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        processed_names = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                processed_names.update((name, hashed_name))
+            yield name, hashed_name, processed
+
+        if dry_run:
+            return
+        for name in sorted(processed_names):
+            path = self.path(name)
+            extension = os.path.splitext(name)[1].lower()
+            if extension == '.png':
+                optimize_png(path)
+            elif extension in ('.jpg', '.jpeg'):
+                optimize_jpeg(path)
+            elif extension in COMPRESSIBLE_EXTENSIONS:
+                write_compressed_copies(path)
+
+
+def _replace_if_smaller(path, data):
+    if len(data) < os.path.getsize(path):
+        with open(path, 'wb') as output:
+            output.write(data)
+
+
+def optimize_png(path):
+    # Re-deflates the image data; pixels are unchanged
+    try:
+        with Image.open(path) as image:
+            image.load()
+            buffer = BytesIO()
+            image.save(buffer, 'PNG', optimize=True)
+    except OSError as error:
+        logger.warning("Cannot optimize %s: %s", path, error)
+        return
+    _replace_if_smaller(path, buffer.getvalue())
+
+
+def optimize_jpeg(path):
+    # Lossless Huffman table optimization; skipped when jpegtran is not installed
+    jpegtran = shutil.which('jpegtran')
+    if not jpegtran:
+        return
+    result = subprocess.run(
+        [jpegtran, '-copy', 'none', '-optimize', '-progressive', path], capture_output=True, check=False
+    )
+    if result.returncode == 0 and result.stdout:
+        _replace_if_smaller(path, result.stdout)
+
+
+def write_compressed_copies(path):
+    with open(path, 'rb') as source:
+        data = source.read()
+    copies = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        copies['.br'] = brotli.compress(data, quality=11)
+    for suffix, compressed in copies.items():
+        if len(compressed) <= len(data) * (1 - MINIMUM_SAVING):
+            with open(path + suffix, 'wb') as output:
+                output.write(compressed)
@@ -0,0 +1,80 @@
+import functools
+import hashlib
+import logging
+import os
+
+from django.conf import settings
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+
+from news.cache import request_news_version
+
+logger = logging.getLogger(__name__)
+
+
+def site_templates():
+    """
+    Names of the site's own templates, from the project and app template
+    directories under BASE_DIR; Django's bundled admin templates are left out.
+    """
+    engine = engines['django'].engine
+    base_dir = os.path.realpath(settings.BASE_DIR)
+    names = set()
+    for loader in engine.template_loaders:
+        for directory in loader.get_dirs():
+            directory = os.path.realpath(directory)
+            if not directory.startswith(base_dir + os.sep):
+                continue
+            for root, dirs, files in os.walk(directory):
+                for filename in files:
+                    if filename.endswith(('.html', '.txt')):
+                        names.add(os.path.relpath(os.path.join(root, filename), directory).replace(os.sep, '/'))
+    return sorted(names)
+
+
+@functools.cache
+def templates_version():
+    """
+    Digest of the site's template sources. Fragment cache keys include it,
+    so fragments cached by the previous release are not served after a
+    deploy that changed the templates.
+    """
+    engine = engines['django'].engine
+    digest = hashlib.md5(usedforsecurity=False)
+    for name in site_templates():
+        try:
+            digest.update(engine.find_template(name)[0].source.encode())
+        except TemplateDoesNotExist:
+            pass
+    return digest.hexdigest()[:12]
+
+
+def warm_templates():
+    """
+    Compile every site template into the cached loader, so the first
+    requests of a new worker do not pay for reading and parsing them.
+    Returns the number of templates compiled.
+    """
+    engine = engines['django'].engine
+    compiled = 0
+    for name in site_templates():
+        try:
+            engine.get_template(name)
+        except (TemplateDoesNotExist, TemplateSyntaxError):
+            # Partials meant for include only can still fail standalone, e.g. on a missing block
+            logger.warning("Could not precompile template %s", name, exc_info=True)
+        else:
+            compiled += 1
+    templates_version()
+    return compiled
+
+
+def fragments(request):
+    """Context processor with what the {% cache %} fragments of the layout and sidebars need."""
+    return {
+        # Read per request so tests and benchmarks can override it
+        'fragment_cache_timeout': getattr(settings, 'FRAGMENT_CACHE_TIMEOUT', 0),
+        'templates_version': templates_version(),
+        # Called only by the templates that cache news-dependent fragments; read
+        # from the database, so every worker drops its stale copies at once
+        'news_changed': lambda: request_news_version(request)[1],
+    }
@@ -0,0 +1,60 @@
+import os
+import shutil
+import tempfile
+
+from asgiref.sync import iscoroutinefunction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from .static import StaticFilesMiddleware, accepted_encodings, choose_encoding
+
+
+class AcceptEncodingTests(SimpleTestCase):
+    def test_parse(self):
+        self.assertEqual(accepted_encodings('gzip, br;q=0, deflate;q=0.5'), {'gzip': 1.0, 'br': 0.0, 'deflate': 0.5})
+        self.assertEqual(accepted_encodings(''), {})
+
+    def test_refused_codings_are_not_chosen(self):
+        self.assertEqual(choose_encoding('gzip, br;q=0', ['br', 'gzip']), 'gzip')
+        self.assertEqual(choose_encoding('gzip;q=0, br;q=0', ['br', 'gzip']), None)
+        self.assertEqual(choose_encoding('*, br;q=0', ['br', 'gzip']), 'gzip')
+
+    def test_tokens_containing_a_coding_name_do_not_match(self):
+        self.assertEqual(choose_encoding('xbrotli, gzipped', ['br', 'gzip']), None)
+
+    def test_preference(self):
+        self.assertEqual(choose_encoding('gzip, br', ['br', 'gzip']), 'br')
+        self.assertEqual(choose_encoding('gzip;q=1, br;q=0.5', ['br', 'gzip']), 'gzip')
+        self.assertEqual(choose_encoding('br', ['gzip']), None)
+
+
+class StaticFilesMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        for name, content in (('app.css', b'body{}'), ('app.css.br', b'br'), ('app.css.gz', b'gz')):
+            with open(os.path.join(self.root, name), 'wb') as output:
+                output.write(content)
+
+    def get(self, accept_encoding):
+        with override_settings(DEBUG=False, STATIC_ROOT=self.root, STATIC_URL='/static/'):
+            middleware = StaticFilesMiddleware(lambda request: HttpResponse(status=404))
+        request = RequestFactory().get('/static/app.css', headers={'Accept-Encoding': accept_encoding})
+        response = middleware(request)
+        return response.headers.get('Content-Encoding'), b''.join(response.streaming_content)
+
+    async def test_async_chain_stays_async(self):
+        async def view(request):
+            return HttpResponse(status=404)
+
+        with override_settings(DEBUG=False, STATIC_ROOT=self.root, STATIC_URL='/static/'):
+            middleware = StaticFilesMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = await middleware(RequestFactory().get('/static/app.css'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((await middleware(RequestFactory().get('/other/'))).status_code, 404)
+
+    def test_serves_the_accepted_copy(self):
+        self.assertEqual(self.get('gzip, br'), ('br', b'br'))
+        self.assertEqual(self.get('gzip, br;q=0'), ('gzip', b'gz'))
+        self.assertEqual(self.get('identity'), (None, b'body{}'))
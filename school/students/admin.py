@@ -1,7 +1,17 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.contrib.auth.models import User
-from .models import Student, Course, Enrollment
-from .forms import StudentForm
+from django.core.exceptions import PermissionDenied
+from .models import Student, Course, Enrollment, DepartmentYearStats, CourseEnrollmentStats
+from django.http import StreamingHttpResponse
+from django.shortcuts import render
+from django.utils import timezone
+from django.urls import path
+from .forms import StudentForm, StudentImportForm
+from .enrollments import bulk_enroll
+from .exports import ENROLLMENT_EXPORT_FIELDS, STUDENT_EXPORT_FIELDS, export_response
+from .importers import import_students
+from .paginator import EstimatedCountPaginator
+from .reports import generate_reports, stream_zip
 from django import forms
 
 
@@ -9,15 +19,24 @@ class StudentAdmin(admin.ModelAdmin):
     form = StudentForm
     exclude = ('student_id',)
     list_display = ['student_id', 'get_first_name', 'get_last_name', 'category', 'current_year', 'department']
+    list_filter = ('category', 'current_year', 'department')
     search_fields = ['student_id', 'user__first_name', 'user__last_name']
+    ordering = ('student_id',)
+    # Names (and Student.__str__ in the row checkboxes) come from one joined query
+    list_select_related = ('user',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ['download_report_cards', 'export_csv', 'export_jsonl']
 
     def get_first_name(self, obj):
         return obj.user.first_name
     get_first_name.short_description = 'First Name'
+    get_first_name.admin_order_field = 'user__first_name'
 
     def get_last_name(self, obj):
         return obj.user.last_name
     get_last_name.short_description = 'Last Name'
+    get_last_name.admin_order_field = 'user__last_name'
 
     def save_model(self, request, obj, form, change):
         if not change:  # When creating a new student
@@ -35,6 +54,58 @@ class StudentAdmin(admin.ModelAdmin):
         # Save the Student instance
         super().save_model(request, obj, form, change)
 
+    @admin.action(description='Download report cards (ZIP)')
+    def download_report_cards(self, request, queryset):
+        # Rendered in a process pool and streamed, the archive is never held in memory
+        filename = f"report-cards-{timezone.localdate():%Y-%m-%d}.zip"
+        response = StreamingHttpResponse(stream_zip(generate_reports(queryset)), content_type='application/zip')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    @admin.action(description='Export selected students (CSV)')
+    def export_csv(self, request, queryset):
+        return export_response(queryset, STUDENT_EXPORT_FIELDS, 'csv', 'students')
+
+    @admin.action(description='Export selected students (JSON lines)')
+    def export_jsonl(self, request, queryset):
+        return export_response(queryset, STUDENT_EXPORT_FIELDS, 'jsonl', 'students')
+
+    def get_urls(self):
+        urls = [
+            path('import/', self.admin_site.admin_view(self.import_view), name='students_student_import'),
+        ]
+        return urls + super().get_urls()
+
+    # Bulk import of students from a CSV/XLSX upload. Passwords are hashed while the request
+    # waits, so StudentImportForm caps the file size; larger files use `manage.py import_students`
+    def import_view(self, request):
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+
+        errors = []
+        if request.method == 'POST':
+            form = StudentImportForm(request.POST, request.FILES)
+            if form.is_valid():
+                upload = form.cleaned_data['file']
+                try:
+                    result = import_students(upload, upload.name)
+                except ValueError as error:
+                    form.add_error('file', str(error))
+                else:
+                    self.message_user(request, str(result), messages.WARNING if result.errors else messages.SUCCESS)
+                    errors = result.errors
+        else:
+            form = StudentImportForm()
+
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Import students',
+            'form': form,
+            'errors': errors,
+        }
+        return render(request, 'admin/students/student/import.html', context)
+
 
 # Helper function to register students based on category, year, and department
 def register_students_in_bulk(modeladmin, request, queryset, category):
@@ -50,10 +121,13 @@ def register_students_in_bulk(modeladmin, request, queryset, category):
     if department:
         students = students.filter(department=department)
 
-    # Register the students for the selected courses
-    for course in courses:
-        for student in students:
-            Enrollment.objects.get_or_create(student=student, course=course)
+    # Register the students for the selected courses in one set-based pass
+    created, skipped = bulk_enroll(students, courses)
+    modeladmin.message_user(
+        request,
+        f"{created} enrollment(s) created, {skipped} already registered and skipped.",
+        messages.SUCCESS,
+    )
 
 
 # Custom actions for registering junior and senior students
@@ -119,13 +193,67 @@ class CourseAdmin(admin.ModelAdmin):
     
 class EnrollmentAdmin(admin.ModelAdmin):
     list_display = ('student', 'course', 'date_enrolled', 'completed')
+    # Student and course names are rendered from one joined query
+    list_select_related = ('student__user', 'course')
     # Ensure you're referencing the 'user' field through the 'student' relation
-    search_fields = ('student__user__username', 'course__course_name')
-    list_filter = ('completed', 'course', 'student__current_year', 'student__department')
+    search_fields = ('student__user__username', 'student__student_id', 'course__course_code', 'course__course_name')
+    # Filter by course through the search box, a sidebar entry per course does not scale
+    list_filter = ('completed', 'course__level', 'student__current_year', 'student__department')
+    autocomplete_fields = ('student', 'course')
     ordering = ('-date_enrolled',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ['export_csv', 'export_jsonl']
+
+    @admin.action(description='Export selected enrollments (CSV)')
+    def export_csv(self, request, queryset):
+        return export_response(queryset, ENROLLMENT_EXPORT_FIELDS, 'csv', 'enrollments')
+
+    @admin.action(description='Export selected enrollments (JSON lines)')
+    def export_jsonl(self, request, queryset):
+        return export_response(queryset, ENROLLMENT_EXPORT_FIELDS, 'jsonl', 'enrollments')
+
+
+class ReadOnlyStatsAdmin(admin.ModelAdmin):
+    """Summary rows are maintained by students.statistics; the admin only reads them."""
+    list_filter = ('category', 'current_year', 'department')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description='Completion rate')
+    def get_completion_rate(self, obj):
+        return '-' if obj.completion_rate is None else f"{obj.completion_rate:.0%}"
+
+
+class DepartmentYearStatsAdmin(ReadOnlyStatsAdmin):
+    list_display = ('category', 'department', 'current_year', 'student_count', 'get_gpa_mean', 'gpa_min', 'gpa_max',
+                    'enrollment_count', 'get_completion_rate')
+    ordering = ('category', 'department', 'current_year')
+
+    @admin.display(description='Mean GPA')
+    def get_gpa_mean(self, obj):
+        return obj.gpa_mean
+
+
+class CourseEnrollmentStatsAdmin(ReadOnlyStatsAdmin):
+    list_display = ('course', 'category', 'department', 'current_year', 'enrollment_count', 'completed_count',
+                    'get_completion_rate')
+    list_select_related = ('course',)
+    list_filter = ('course__level',) + ReadOnlyStatsAdmin.list_filter
+    search_fields = ('course__course_code', 'course__course_name')
+    ordering = ('course__course_code', 'category', 'department', 'current_year')
 
 
 # Register the models in Django admin
 admin.site.register(Student, StudentAdmin)
 admin.site.register(Course, CourseAdmin)
 admin.site.register(Enrollment, EnrollmentAdmin)
+admin.site.register(DepartmentYearStats, DepartmentYearStatsAdmin)
+admin.site.register(CourseEnrollmentStats, CourseEnrollmentStatsAdmin)
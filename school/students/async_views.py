@@ -0,0 +1,53 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.shortcuts import aget_object_or_404, render
+
+from news.cache import homepage_fragments
+from news.http import announcement_key, homepage_key, news_key, public_page
+from news.models import News, Announcement
+
+# Async versions of the public read views, used when the site runs under an
+# ASGI server with ASYNC_VIEWS enabled. Template rendering stays synchronous
+# because the layout reads request.user, which may need the session.
+arender = sync_to_async(render)
+
+
+async def _list(queryset):
+    return [item async for item in queryset]
+
+
+@public_page(homepage_key)
+async def index(request):
+    # The news and announcement blocks come pre-rendered from the homepage cache
+    context = await sync_to_async(homepage_fragments)()
+    return await arender(request, 'index.html', context)
+
+
+@public_page(news_key)
+async def news_detail(request, news_id):
+    # The news item and the sidebar list are fetched concurrently
+    news_item, latest_news = await asyncio.gather(
+        aget_object_or_404(News, id=news_id),
+        _list(News.objects.exclude(id=news_id).order_by('-time')[:4]),
+    )
+    context = {
+        'latest_news': latest_news,
+        'paragraphs': news_item.paragraphs,
+        'news': news_item,
+    }
+    return await arender(request, 'news_detail.html', context)
+
+
+@public_page(announcement_key)
+async def announcement_detail(request, announcement_id):
+    announcement_item, latest_announcements = await asyncio.gather(
+        aget_object_or_404(Announcement, id=announcement_id),
+        _list(Announcement.objects.order_by('-time')[:3]),
+    )
+    context = {
+        'paragraphs': announcement_item.paragraphs,
+        'announcement': announcement_item,
+        'latest_announcements': latest_announcements,
+    }
+    return await arender(request, 'announcements_detail.html', context)
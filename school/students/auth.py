@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+# Seconds a resolved user is kept; saving the user or their student profile drops it earlier
+USER_CACHE_TIMEOUT = getattr(settings, 'USER_CACHE_TIMEOUT', 15 * 60)
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def invalidate_user(user_id):
+    cache.delete(user_cache_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend whose get_user(), called by AuthenticationMiddleware on
+    every request, is answered from the cache. The user is loaded together
+    with their student profile, so views read request.user.student_profile
+    without another query. Django still checks the session auth hash
+    against the cached user, so a password change logs other sessions out.
+    """
+
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            try:
+                user = get_user_model()._default_manager.select_related('student_profile').get(pk=user_id)
+            except get_user_model().DoesNotExist:
+                return None
+            cache.set(key, user, USER_CACHE_TIMEOUT)
+        return user if self.user_can_authenticate(user) else None
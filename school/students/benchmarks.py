@@ -0,0 +1,293 @@
+import json
+import os
+import secrets
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass, field
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.backends.base.creation import TEST_DATABASE_PREFIX
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from monitoring.instrumentation import RequestMetrics, current_metrics
+from news.models import Announcement, News
+from school.templating import warm_templates
+from .models import Course, Student
+from .seed import SEED_PASSWORD
+
+# A route is slower than its baseline when its median exceeds it by this fraction...
+BENCHMARK_THRESHOLD = 0.25
+
+# ...and by at least this many milliseconds, so timer noise on fast routes is not a regression
+BENCHMARK_MIN_DELTA_MS = 2.0
+
+
+@dataclass
+class Route:
+    name: str
+    method: str
+    path: object  # URL, or callable(fixtures) returning one
+    user: str = None  # None, 'student' or 'admin'
+    data: object = None  # POST data, or callable(fixtures) returning it
+    repeat: int = None  # Overrides the run's repeat count, e.g. for slow password checks
+    rollback: bool = False  # Undo what the request wrote, so every run starts alike
+    relogin: bool = False  # Log in again before every run, for requests that end the session
+    renders: bool = True  # False for redirects, JSON and files; left out of the template benchmarks
+    expected_status: tuple = (200,)
+
+
+@dataclass
+class Result:
+    name: str
+    status: int
+    median_ms: float
+    p95_ms: float
+    queries: int
+    samples: list = field(default_factory=list, repr=False)
+
+
+@dataclass
+class TemplateResult:
+    name: str
+    mode: str  # 'before': templates compiled per request, no fragments; 'after': cached loader and fragments
+    render_ms: float  # Median time in the outermost template render
+    total_ms: float
+
+
+def _course_action(action):
+    def data(fixtures):
+        return {'action': action, '_selected_action': fixtures['course_ids'], 'year': '1', 'department': ''}
+    return data
+
+
+ROUTES = [
+    Route('index', 'get', '/'),
+    Route('about', 'get', '/about/'),
+    Route('news_archive', 'get', '/news/'),
+    Route('announcement_archive', 'get', '/announcements/'),
+    Route('news_detail', 'get', lambda fixtures: reverse('news_detail', args=[fixtures['news_id']])),
+    Route('announcement_detail', 'get',
+          lambda fixtures: reverse('announcement_detail', args=[fixtures['announcement_id']])),
+    Route('search', 'get', '/search/?q=examination+results'),
+    Route('login_form', 'get', '/login/'),
+    Route('login', 'post', '/login/', repeat=3, expected_status=(302,),
+          data=lambda fixtures: {'username': fixtures['username'], 'password': SEED_PASSWORD}),
+    Route('logout', 'get', '/logout/', user='student', relogin=True, renders=False, expected_status=(302,)),
+    Route('signup', 'get', '/signup/'),
+    Route('dashboard', 'get', '/dashboard/', user='student'),
+    Route('profile', 'get', '/profile/', user='student'),
+    Route('courses', 'get', '/courses/', user='student'),
+    Route('admin_students', 'get', '/admin/students/student/', user='admin'),
+    Route('admin_enrollments', 'get', '/admin/students/enrollment/', user='admin'),
+    Route('admin_courses', 'get', '/admin/students/course/', user='admin'),
+    Route('login_stats', 'get', '/login/stats/', user='admin', renders=False),
+    Route('media', 'get', lambda fixtures: settings.MEDIA_URL + fixtures['media_name'], user='admin', renders=False),
+    Route('admin_register_junior_students', 'post', '/admin/students/course/', user='admin', rollback=True,
+          data=_course_action('register_junior_students'), expected_status=(302,)),
+    Route('admin_register_senior_students', 'post', '/admin/students/course/', user='admin', rollback=True,
+          data=_course_action('register_senior_students'), expected_status=(302,)),
+]
+
+
+# Private upload served by the media route, written to the run's temporary MEDIA_ROOT
+BENCHMARK_MEDIA_NAME = 'profile_pictures/benchmark.txt'
+
+
+def _is_test_database():
+    name = str(connection.settings_dict['NAME'])
+    return (os.path.basename(name).startswith(TEST_DATABASE_PREFIX) or name == ':memory:'
+            or name.startswith('file:memorydb'))
+
+
+def fixtures():
+    """
+    The rows the routes point at: always the same ones for the same seeded
+    data. Creates a superuser when there is none, so only runs against a
+    development (DEBUG) or test database; the new account's password is
+    returned as 'admin_password'.
+    """
+    if not settings.DEBUG and not _is_test_database():
+        raise ValueError("Benchmarks only run with DEBUG on or against a test database")
+    if not default_storage.exists(BENCHMARK_MEDIA_NAME):
+        default_storage.save(BENCHMARK_MEDIA_NAME, ContentFile(b'x' * 16 * 1024))
+    student = Student.objects.select_related('user').order_by('student_id').first()
+    if student is None:
+        raise ValueError("No students to benchmark with, run `manage.py seed_data` first")
+    admin, admin_password = User.objects.filter(is_superuser=True).order_by('pk').first(), None
+    if admin is None:
+        admin_password = secrets.token_urlsafe()
+        admin = User.objects.create_superuser('benchmark-admin', 'benchmark@example.com', admin_password)
+    return {
+        'student': student.user,
+        'username': student.user.username,
+        'admin': admin,
+        'admin_password': admin_password,
+        'news_id': News.objects.order_by('-time', '-id').values_list('pk', flat=True).first(),
+        'announcement_id': Announcement.objects.order_by('-time', '-id').values_list('pk', flat=True).first(),
+        'course_ids': list(Course.objects.order_by('course_code').values_list('pk', flat=True)[:5]),
+        'media_name': BENCHMARK_MEDIA_NAME,
+    }
+
+
+def _request(client, route, path, data, request_number):
+    # Each login comes from its own address so the login throttle does not answer instead
+    extra = {'REMOTE_ADDR': f'10.0.{request_number // 250}.{request_number % 250 + 1}'}
+    response = getattr(client, route.method)(path, data, **extra)
+    if response.streaming:
+        b''.join(response.streaming_content)
+    return response
+
+
+def run_route(route, fixture, repeat=20, warmup=2):
+    client = Client()
+    if route.user:
+        client.force_login(fixture[route.user])
+    path = route.path(fixture) if callable(route.path) else route.path
+    data = route.data(fixture) if callable(route.data) else route.data
+
+    samples, queries, status = [], 0, None
+    runs = route.repeat or repeat
+    for number in range(warmup + runs):
+        if route.relogin and number:
+            client.force_login(fixture[route.user])
+        with transaction.atomic() if route.rollback else nullcontext():
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = _request(client, route, path, data, number)
+                elapsed = (time.perf_counter() - started) * 1000
+            if route.rollback:
+                transaction.set_rollback(True)
+        status = response.status_code
+        if status not in route.expected_status:
+            raise AssertionError(f"{route.name}: {route.method.upper()} {path} answered {status}")
+        if number >= warmup:
+            samples.append(elapsed)
+            queries = max(queries, len(captured))
+
+    samples.sort()
+    return Result(
+        name=route.name, status=status, median_ms=round(statistics.median(samples), 2),
+        p95_ms=round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 2), queries=queries,
+        samples=samples,
+    )
+
+
+@contextmanager
+def benchmark_settings(**overrides):
+    # The test client's host must be accepted whatever the deployment settings say, sampled
+    # request timings must not add their INSERT to a route's queries, and the media file
+    # goes to a throwaway MEDIA_ROOT
+    with tempfile.TemporaryDirectory() as media_root:
+        with override_settings(ALLOWED_HOSTS=['testserver'], MONITORING_SAMPLE_RATE=0, MEDIA_ROOT=media_root,
+                               **overrides):
+            yield
+
+
+def run_benchmarks(routes=ROUTES, repeat=20, warmup=2):
+    """Time every route with warm caches; returns a Result per route."""
+    with benchmark_settings():
+        fixture = fixtures()
+        return [run_route(route, fixture, repeat=repeat, warmup=warmup) for route in routes]
+
+
+# The pages rendered from templates; POST routes redirect without rendering
+TEMPLATE_ROUTES = [route for route in ROUTES if route.method == 'get' and route.renders]
+
+
+def _template_settings(cached):
+    loaders = getattr(settings, 'TEMPLATE_LOADERS', [
+        'django.template.loaders.filesystem.Loader', 'django.template.loaders.app_directories.Loader',
+    ])
+    engine = settings.TEMPLATES[0]
+    options = dict(engine['OPTIONS'], loaders=[('django.template.loaders.cached.Loader', loaders)] if cached else loaders)
+    return {
+        'TEMPLATES': [dict(engine, OPTIONS=options), *settings.TEMPLATES[1:]],
+        'FRAGMENT_CACHE_TIMEOUT': 24 * 60 * 60 if cached else 0,
+    }
+
+
+def run_template_route(route, fixture, mode, repeat=20, warmup=2):
+    client = Client()
+    if route.user:
+        client.force_login(fixture[route.user])
+    path = route.path(fixture) if callable(route.path) else route.path
+
+    render_samples, total_samples = [], []
+    for number in range(warmup + repeat):
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            started = time.perf_counter()
+            response = _request(client, route, path, None, number)
+            elapsed = (time.perf_counter() - started) * 1000
+        finally:
+            current_metrics.reset(token)
+        if response.status_code not in route.expected_status:
+            raise AssertionError(f"{route.name}: GET {path} answered {response.status_code}")
+        if number >= warmup:
+            render_samples.append(metrics.template_seconds * 1000)
+            total_samples.append(elapsed)
+    return TemplateResult(
+        name=route.name, mode=mode, render_ms=round(statistics.median(render_samples), 2),
+        total_ms=round(statistics.median(total_samples), 2),
+    )
+
+
+def run_template_benchmarks(routes=TEMPLATE_ROUTES, repeat=20, warmup=2):
+    """
+    Time template rendering of every page twice: with templates read and
+    compiled on each request and no fragment caching ('before'), then with
+    the production template mode ('after'). Returns a TemplateResult per
+    route and mode.
+    """
+    # The request instrumentation of the monitoring middleware is replaced by our own
+    with benchmark_settings(MONITORING_SERVER_TIMING_ALWAYS=False):
+        fixture = fixtures()
+        results = []
+        for mode, cached in (('before', False), ('after', True)):
+            with override_settings(**_template_settings(cached)):
+                if cached:
+                    warm_templates()
+                results.extend(run_template_route(route, fixture, mode, repeat, warmup) for route in routes)
+        return results
+
+
+def save_baseline(results, path):
+    baseline = {result.name: {key: value for key, value in asdict(result).items() if key != 'samples'}
+                for result in results}
+    with open(path, 'w') as output:
+        json.dump(baseline, output, indent=2, sort_keys=True)
+
+
+def load_baseline(path):
+    with open(path) as source:
+        return json.load(source)
+
+
+def regressions(results, baseline, threshold=BENCHMARK_THRESHOLD, min_delta_ms=BENCHMARK_MIN_DELTA_MS):
+    """
+    Compare results with a saved baseline. A route regresses when it runs
+    more queries, or its median is slower by more than `threshold` and
+    `min_delta_ms`. Returns a list of messages, empty when nothing did.
+    """
+    messages = []
+    for result in results:
+        previous = baseline.get(result.name)
+        if previous is None:
+            continue
+        if result.queries > previous['queries']:
+            messages.append(f"{result.name}: {result.queries} queries, baseline {previous['queries']}")
+        slower = result.median_ms - previous['median_ms']
+        if slower > min_delta_ms and result.median_ms > previous['median_ms'] * (1 + threshold):
+            messages.append(
+                f"{result.name}: median {result.median_ms:.1f} ms, baseline {previous['median_ms']:.1f} ms"
+            )
+    return messages
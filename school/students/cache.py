@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+
+# Seconds a rendered dashboard enrollment table is kept; signals invalidate it earlier
+DASHBOARD_CACHE_TIMEOUT = getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 60 * 60)
+
+
+def dashboard_enrollments_key(student_id):
+    # Must match the {% cache %} fragment name and vary-on in dashboard.html
+    return make_template_fragment_key('dashboard_enrollments', [student_id])
+
+
+def invalidate_dashboards(student_ids):
+    cache.delete_many([dashboard_enrollments_key(student_id) for student_id in student_ids])
@@ -0,0 +1,81 @@
+import datetime
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
+
+from .models import Course, Enrollment
+
+# Seconds a built catalog is kept; changes replace it earlier under a new version
+CATALOG_CACHE_TIMEOUT = getattr(settings, 'CATALOG_CACHE_TIMEOUT', 24 * 60 * 60)
+
+CATALOG_CHANGED_KEY = 'courses:catalog:changed'
+
+
+def catalog_changed():
+    """
+    Time of the last change to the courses or their enrollment counts, as a
+    Unix timestamp. It versions the cached catalog and is the page's
+    Last-Modified.
+    """
+    changed = cache.get(CATALOG_CHANGED_KEY)
+    if changed is None:
+        # Evicted: start a new version, as the catalog may have changed meanwhile
+        cache.add(CATALOG_CHANGED_KEY, int(time.time()), None)
+        changed = cache.get(CATALOG_CHANGED_KEY, int(time.time()))
+    return changed
+
+
+def catalog_last_modified():
+    return datetime.datetime.fromtimestamp(catalog_changed(), tz=datetime.timezone.utc)
+
+
+def _build_catalog():
+    courses = (
+        Course.objects.annotate(enrollment_count=Coalesce(Sum('enrollment_stats__enrollment_count'), 0))
+        .order_by('level', 'course_code')
+        .values('pk', 'course_code', 'course_name', 'description', 'credits', 'level', 'enrollment_count')
+    )
+    levels = {code: {'code': code, 'name': name, 'courses': []} for code, name in Course.LEVEL_CHOICES}
+    for course in courses:
+        levels[course['level']]['courses'].append(course)
+    return [level for level in levels.values() if level['courses']]
+
+
+def course_catalog():
+    """
+    Every course grouped by level, with its enrollment count from the
+    statistics tables. Built once per change and shared by all users.
+    """
+    key = f'courses:catalog:{catalog_changed()}'
+    catalog = cache.get(key)
+    if catalog is None:
+        catalog = _build_catalog()
+        cache.set(key, catalog, CATALOG_CACHE_TIMEOUT)
+    return catalog
+
+
+def _new_version():
+    # Always later than the current version, even for several changes within a second
+    cache.set(CATALOG_CHANGED_KEY, max(int(time.time()), cache.get(CATALOG_CHANGED_KEY, 0) + 1), None)
+
+
+def invalidate_catalog():
+    # After commit, so a catalog rebuilt meanwhile cannot be stored under the new version
+    transaction.on_commit(_new_version)
+
+
+def student_enrollments(student):
+    """The per-student part of the catalog: {course pk: completed} of the student's enrollments."""
+    if student is None:
+        return {}
+    return dict(Enrollment.objects.filter(student=student).values_list('course_id', 'completed'))
+
+
+def catalog_etag(enrollments):
+    overlay = ','.join(f'{course_id}:{int(completed)}' for course_id, completed in sorted(enrollments.items()))
+    return hashlib.md5(f'{catalog_changed()}|{overlay}'.encode(), usedforsecurity=False).hexdigest()
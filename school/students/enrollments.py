@@ -0,0 +1,49 @@
+from django.db import transaction
+
+from .cache import invalidate_dashboards
+from .models import Enrollment
+from .statistics import class_groups, refresh_groups
+
+# Rows per INSERT statement, small enough for SQLite's variable limit
+ENROLLMENT_BATCH_SIZE = 500
+
+
+def bulk_enroll(students, courses, batch_size=ENROLLMENT_BATCH_SIZE):
+    """
+    Enroll every student in every course, skipping pairs that already exist.
+
+    Works on sets of primary keys instead of model instances: the student and
+    course ids are read once, the existing pairs are read in one query, and
+    only the missing pairs are inserted in batches. Returns a tuple of
+    (created, skipped).
+    """
+    with transaction.atomic():
+        student_ids = list(students.values_list('pk', flat=True))
+        course_ids = list(courses.values_list('pk', flat=True))
+        if not student_ids or not course_ids:
+            return 0, 0
+
+        # One diff query: every pair that is already enrolled
+        pairs = Enrollment.objects.filter(course__in=courses, student__in=students)
+        existing = set(pairs.values_list('student_id', 'course_id'))
+
+        missing = [
+            Enrollment(student_id=student_id, course_id=course_id)
+            for course_id in course_ids
+            for student_id in student_ids
+            if (student_id, course_id) not in existing
+        ]
+
+        # The unique constraint on (student, course) makes concurrent
+        # registrations safe; the conflicting rows are simply dropped.
+        Enrollment.objects.bulk_create(missing, batch_size=batch_size, ignore_conflicts=True)
+        created = pairs.count() - len(existing) if missing else 0
+        # bulk_create does not send post_save, so recount the statistics of the
+        # affected classes and drop the cached dashboards here
+        if created:
+            refresh_groups(class_groups(student_ids))
+
+    invalidate_dashboards({enrollment.student_id for enrollment in missing})
+
+    total = len(student_ids) * len(course_ids)
+    return created, total - created
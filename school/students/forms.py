@@ -1,6 +1,13 @@
 from django import forms
+from django.conf import settings
+from django.template.defaultfilters import filesizeformat
 from .models import Student
 
+# The admin import hashes every password inside the request, so larger files are refused
+# there and go through `manage.py import_students` instead
+STUDENT_IMPORT_MAX_SIZE = getattr(settings, 'STUDENT_IMPORT_MAX_SIZE', 256 * 1024)
+
+
 class StudentForm(forms.ModelForm):
     username = forms.CharField(required=True)
     first_name = forms.CharField(required=True)
@@ -34,3 +41,18 @@ class BulkRegistrationForm(forms.Form):
         ('WLD', 'Welding and Fabrication'),
         ('TRV', 'Radio and Television (TRV) Electronic')
     ], required=False)
+
+
+class StudentImportForm(forms.Form):
+    file = forms.FileField(help_text='A .csv or .xlsx file with one student per row and StudentForm field names as column headers.')
+
+    def clean_file(self):
+        upload = self.cleaned_data['file']
+        if not upload.name.lower().endswith(('.csv', '.xlsx')):
+            raise forms.ValidationError('Upload a .csv or .xlsx file.')
+        if upload.size > STUDENT_IMPORT_MAX_SIZE:
+            raise forms.ValidationError(
+                f'Files over {filesizeformat(STUDENT_IMPORT_MAX_SIZE)} take too long to import here; '
+                'use `manage.py import_students` instead.'
+            )
+        return upload
@@ -0,0 +1,118 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Width, in pixels, of each derived image
+IMAGE_VARIANTS = getattr(settings, 'IMAGE_VARIANTS', {
+    'thumbnail': 160,
+    'medium': 640,
+    'large': 1280,
+})
+
+# Output formats, preferred first; JPEG is the fallback for browsers without WebP
+IMAGE_VARIANT_FORMATS = (
+    ('webp', 'WEBP', {'quality': 80, 'method': 4}),
+    ('jpg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+)
+
+# Generate variants in a background thread instead of during the upload request
+IMAGE_VARIANTS_ASYNC = getattr(settings, 'IMAGE_VARIANTS_ASYNC', True)
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='image-variants')
+
+
+def variant_name(name, variant, extension):
+    # news_images/photo.jpg -> news_images/photo.thumbnail.webp
+    stem = os.path.splitext(name)[0]
+    return f"{stem}.{variant}.{extension}"
+
+
+def generate_variants(storage, name):
+    """
+    Write the size/format variants of the image `name` next to the original,
+    each exactly its IMAGE_VARIANTS width: sizes wider than the image are left
+    out. Returns the number of files written.
+    """
+    try:
+        with storage.open(name) as original:
+            image = Image.open(original)
+            image.load()
+    except (OSError, FileNotFoundError) as error:
+        logger.warning("Cannot create image variants for %s: %s", name, error)
+        return 0
+
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+
+    written = 0
+    for variant, width in IMAGE_VARIANTS.items():
+        targets = [variant_name(name, variant, extension) for extension, image_format, options in IMAGE_VARIANT_FORMATS]
+        for target in targets:
+            if storage.exists(target):
+                storage.delete(target)
+        if width > image.width:
+            # Images are never upscaled, so this variant would not be `width` pixels wide: leave it out
+            continue
+        resized = image.copy()
+        resized.thumbnail((width, image.height), Image.Resampling.LANCZOS)  # Keeps aspect ratio
+        for target, (extension, image_format, options) in zip(targets, IMAGE_VARIANT_FORMATS):
+            output = resized.convert('RGB') if image_format == 'JPEG' else resized
+            buffer = BytesIO()
+            output.save(buffer, image_format, **options)
+            storage.save(target, ContentFile(buffer.getvalue()))
+            written += 1
+    return written
+
+
+def available_variants(field_file):
+    """(variant, width) of the variants written for this image, smallest first."""
+    if not field_file:
+        return []
+    return [
+        (variant, width) for variant, width in sorted(IMAGE_VARIANTS.items(), key=lambda item: item[1])
+        if field_file.storage.exists(variant_name(field_file.name, variant, 'jpg'))
+    ]
+
+
+def has_variants(field_file):
+    # The smallest variant is written for every image at least that wide
+    smallest = min(IMAGE_VARIANTS, key=IMAGE_VARIANTS.get)
+    return bool(field_file) and field_file.storage.exists(variant_name(field_file.name, smallest, 'jpg'))
+
+
+def schedule_variants(field_file, callback=None):
+    """
+    Queue variant generation for an uploaded image once the surrounding
+    transaction commits. Nothing is done if the variants already exist.
+    `callback` runs after the variants are written, e.g. to drop cached HTML
+    that still points at the original.
+    """
+    if not field_file or has_variants(field_file):
+        return
+    storage, name = field_file.storage, field_file.name
+
+    def job():
+        if generate_variants(storage, name) and callback:
+            callback()
+
+    if IMAGE_VARIANTS_ASYNC:
+        transaction.on_commit(lambda: _executor.submit(job))
+    else:
+        transaction.on_commit(job)
+
+
+def srcset(field_file, extension, variants):
+    # Only variants that exist, so every width given to the browser is the file's real width
+    return ', '.join(
+        f"{field_file.storage.url(variant_name(field_file.name, variant, extension))} {width}w"
+        for variant, width in variants
+    )
@@ -0,0 +1,194 @@
+import csv
+import datetime
+import io
+import os
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from .forms import StudentForm
+from .models import Student
+from .statistics import group_of, refresh_groups
+from .workers import process_pool
+
+# Rows validated, hashed and inserted together
+IMPORT_BATCH_SIZE = 500
+
+# Columns that belong to the User row rather than the Student row
+USER_FIELDS = ('username', 'first_name', 'last_name', 'email', 'password')
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.errors = []  # (line number, message)
+
+    def add_error(self, line, message):
+        self.errors.append((line, message))
+
+    def __str__(self):
+        return f"{self.created} student(s) imported, {len(self.errors)} row(s) rejected."
+
+
+def _normalize(value):
+    # Spreadsheet cells come back as numbers/datetimes, the form expects strings or dates
+    if value is None:
+        return ''
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _read_csv(fileobj):
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    try:
+        for row in csv.DictReader(text):
+            yield {key.strip(): _normalize(value) for key, value in row.items() if key}
+    finally:
+        # Do not close the underlying upload when the wrapper is collected
+        text.detach()
+
+
+def _read_xlsx(fileobj):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("Importing .xlsx files requires the openpyxl package.")
+
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else '' for cell in next(rows, ())]
+        for values in rows:
+            if not any(value is not None for value in values):
+                continue
+            yield {key: _normalize(value) for key, value in zip(header, values) if key}
+    finally:
+        workbook.close()
+
+
+def read_rows(fileobj, filename):
+    """
+    Stream the rows of a CSV or XLSX file as dictionaries keyed by column name.
+    Rows are read lazily so the whole file is never held in memory.
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == '.csv':
+        return _read_csv(fileobj)
+    if extension == '.xlsx':
+        return _read_xlsx(fileobj)
+    raise ValueError(f"Unsupported file type '{extension}', use .csv or .xlsx")
+
+
+def _batches(rows, size):
+    batch = []
+    # Line 1 is the header row
+    for line, row in enumerate(rows, start=2):
+        batch.append((line, row))
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _validate(batch, seen_usernames, result):
+    valid = []
+    for line, row in batch:
+        form = StudentForm(data=row)
+        if not form.is_valid():
+            errors = '; '.join(f"{field}: {' '.join(messages)}" for field, messages in form.errors.items())
+            result.add_error(line, errors)
+            continue
+
+        data = form.cleaned_data
+        if data['category'] == 'Senior' and not data.get('department'):
+            result.add_error(line, "department: Department is required for senior students")
+            continue
+        if data['username'] in seen_usernames:
+            result.add_error(line, f"username: '{data['username']}' appears more than once in the file")
+            continue
+        seen_usernames.add(data['username'])
+        valid.append((line, data))
+
+    # One query per batch for usernames that are already taken
+    taken = set(
+        User.objects.filter(username__in=[data['username'] for line, data in valid])
+        .values_list('username', flat=True)
+    )
+    for line, data in valid:
+        if data['username'] in taken:
+            result.add_error(line, f"username: '{data['username']}' already exists")
+    return [(line, data) for line, data in valid if data['username'] not in taken]
+
+
+def _insert(rows, hashed_passwords):
+    users = [
+        User(
+            username=data['username'],
+            email=data['email'],
+            first_name=data['first_name'],
+            last_name=data['last_name'],
+            password=password,
+        )
+        for (line, data), password in zip(rows, hashed_passwords)
+    ]
+
+    with transaction.atomic():
+        # Reserve a block of student IDs per category; a failed batch gives them back
+        student_ids = {}
+        for category in ('Junior', 'Senior'):
+            count = sum(1 for line, data in rows if data['category'] == category)
+            if count:
+                student_ids[category] = iter(Student.allocate_student_ids(category, count))
+
+        User.objects.bulk_create(users, batch_size=IMPORT_BATCH_SIZE)
+
+        if any(user.pk is None for user in users):
+            # Backends that cannot return ids from bulk inserts
+            ids = dict(
+                User.objects.filter(username__in=[user.username for user in users])
+                .values_list('username', 'pk')
+            )
+            for user in users:
+                user.pk = ids[user.username]
+
+        students = []
+        for (line, data), user in zip(rows, users):
+            fields = {key: value for key, value in data.items() if key not in USER_FIELDS}
+            if fields['category'] == 'Junior':
+                fields['department'] = None  # No department for junior students
+            students.append(Student(user=user, student_id=next(student_ids[fields['category']]), **fields))
+        Student.objects.bulk_create(students, batch_size=IMPORT_BATCH_SIZE)
+        # bulk_create sends no signals, so the class statistics are recounted here
+        refresh_groups({group_of(student) for student in students})
+
+
+def import_students(fileobj, filename, batch_size=IMPORT_BATCH_SIZE, max_workers=None):
+    """
+    Import students from a CSV or XLSX file.
+
+    Rows are validated with the same rules as StudentForm, password hashes
+    are computed in a process pool, and each batch of User and Student rows
+    is written with bulk inserts. Invalid rows are skipped and reported in
+    the returned ImportResult.
+    """
+    result = ImportResult()
+    seen_usernames = set()
+
+    with process_pool(max_workers) as pool:
+        for batch in _batches(read_rows(fileobj, filename), batch_size):
+            rows = _validate(batch, seen_usernames, result)
+            if not rows:
+                continue
+            passwords = [data['password'] for line, data in rows]
+            hashed_passwords = list(pool.map(make_password, passwords, chunksize=max(1, len(passwords) // 32)))
+            _insert(rows, hashed_passwords)
+            result.created += len(rows)
+
+    return result
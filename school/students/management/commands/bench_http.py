@@ -0,0 +1,76 @@
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+async def fetch(url):
+    parts = urlsplit(url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    try:
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\nConnection: close\r\n\r\n".encode())
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()  # Drain the body until the server closes
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+async def run_load(url, requests, concurrency):
+    latencies = []
+    errors = 0
+    remaining = requests
+
+    async def client():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                status = await fetch(url)
+            except (OSError, ValueError, IndexError):
+                status = None
+            latencies.append(time.perf_counter() - started)
+            if status != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return time.perf_counter() - started, latencies, errors
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure requests/sec and latency of running servers under concurrent load. '
+        'Start the site under a WSGI server (e.g. gunicorn school.wsgi) and under an ASGI server '
+        'with SCHOOL_ASYNC_VIEWS=1 (e.g. uvicorn school.asgi:application), then compare them with '
+        '--target sync=http://127.0.0.1:8000/ --target async=http://127.0.0.1:8001/'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', action='append', required=True, help='label=url, may be repeated')
+        parser.add_argument('--requests', type=int, default=5000)
+        parser.add_argument('--concurrency', type=int, default=200)
+
+    def handle(self, *args, **options):
+        targets = []
+        for target in options['target']:
+            label, separator, url = target.partition('=')
+            if not separator or not url.startswith('http://'):
+                raise CommandError(f"Expected label=http://host:port/path, got '{target}'")
+            targets.append((label, url))
+
+        self.stdout.write(f"{'target':<12}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for label, url in targets:
+            elapsed, latencies, errors = asyncio.run(run_load(url, options['requests'], options['concurrency']))
+            percentiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+            self.stdout.write(
+                f"{label:<12}{len(latencies) / elapsed:>10.1f}{percentiles[49] * 1000:>10.1f}"
+                f"{percentiles[94] * 1000:>10.1f}{percentiles[98] * 1000:>10.1f}{errors:>8}"
+            )
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from students.benchmarks import TEMPLATE_ROUTES, run_template_benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure template render time of every page without and with the production template mode '
+        '(cached loader, precompiled templates and fragment caching)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20, help='Timed requests per route and mode')
+        parser.add_argument('--warmup', type=int, default=2, help='Untimed requests per route and mode first')
+        parser.add_argument('--route', action='append', dest='routes',
+                            choices=[route.name for route in TEMPLATE_ROUTES], help='Only run this route; may be repeated')
+
+    def handle(self, *args, **options):
+        routes = [route for route in TEMPLATE_ROUTES if not options['routes'] or route.name in options['routes']]
+        try:
+            results = run_template_benchmarks(routes, repeat=options['repeat'], warmup=options['warmup'])
+        except (ValueError, AssertionError) as error:
+            raise CommandError(error)
+
+        by_route = {}
+        for result in results:
+            by_route.setdefault(result.name, {})[result.mode] = result
+        self.stdout.write(
+            f"{'route':22} {'render before':>14} {'render after':>13} {'speedup':>8} {'total before':>13} {'total after':>12}"
+        )
+        for name, modes in by_route.items():
+            before, after = modes['before'], modes['after']
+            speedup = before.render_ms / after.render_ms if after.render_ms else float('inf')
+            self.stdout.write(
+                f"{name:22} {before.render_ms:11.2f} ms {after.render_ms:10.2f} ms {speedup:7.1f}x "
+                f"{before.total_ms:10.2f} ms {after.total_ms:9.2f} ms"
+            )
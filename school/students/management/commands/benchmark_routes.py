@@ -0,0 +1,54 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from students.benchmarks import (
+    BENCHMARK_MIN_DELTA_MS, BENCHMARK_THRESHOLD, ROUTES, load_baseline, regressions, run_benchmarks, save_baseline,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure latency and query count of every public page, student page and admin action, '
+        'and fail when one regressed against the saved baseline'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20, help='Timed requests per route')
+        parser.add_argument('--warmup', type=int, default=2, help='Untimed requests per route first')
+        parser.add_argument('--route', action='append', dest='routes', choices=[route.name for route in ROUTES],
+                            help='Only run this route; may be repeated')
+        parser.add_argument('--baseline', default=os.path.join(settings.BASE_DIR, 'benchmark_baseline.json'))
+        parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline')
+        parser.add_argument('--threshold', type=float, default=BENCHMARK_THRESHOLD,
+                            help='Allowed slowdown of the median as a fraction, e.g. 0.25')
+        parser.add_argument('--min-delta-ms', type=float, default=BENCHMARK_MIN_DELTA_MS)
+
+    def handle(self, *args, **options):
+        routes = [route for route in ROUTES if not options['routes'] or route.name in options['routes']]
+        try:
+            results = run_benchmarks(routes, repeat=options['repeat'], warmup=options['warmup'])
+        except (ValueError, AssertionError) as error:
+            raise CommandError(error)
+
+        self.stdout.write(f"{'route':34} {'median ms':>10} {'p95 ms':>10} {'queries':>8}")
+        for result in results:
+            self.stdout.write(f"{result.name:34} {result.median_ms:10.2f} {result.p95_ms:10.2f} {result.queries:8}")
+
+        if options['save_baseline']:
+            save_baseline(results, options['baseline'])
+            self.stdout.write(self.style.SUCCESS(f"Baseline saved to {options['baseline']}"))
+            return
+        if not os.path.exists(options['baseline']):
+            self.stdout.write(f"No baseline at {options['baseline']}; run with --save-baseline to create one")
+            return
+
+        failures = regressions(
+            results, load_baseline(options['baseline']), options['threshold'], options['min_delta_ms']
+        )
+        if failures:
+            for message in failures:
+                self.stderr.write(message)
+            raise CommandError(f"{len(failures)} regression(s) against {options['baseline']}")
+        self.stdout.write(self.style.SUCCESS("No regressions against the baseline"))
@@ -0,0 +1,38 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from students.exports import (
+    ENROLLMENT_EXPORT_FIELDS, EXPORT_CHUNK_SIZE, EXPORT_FORMATS, STUDENT_EXPORT_FIELDS, buffered, export_lines,
+)
+from students.models import Enrollment, Student
+
+EXPORTS = {
+    'students': (Student, STUDENT_EXPORT_FIELDS),
+    'enrollments': (Enrollment, ENROLLMENT_EXPORT_FIELDS),
+}
+
+
+class Command(BaseCommand):
+    help = 'Stream every student or enrollment row to a CSV or JSON lines file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('table', choices=EXPORTS)
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+        parser.add_argument('--output', help='File to write (default: standard output)')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        model, fields = EXPORTS[options['table']]
+        lines = export_lines(model.objects.all(), fields, options['format'], chunk_size=options['chunk_size'])
+        try:
+            # newline='' keeps the csv module's \r\n line endings as they are
+            output = open(options['output'], 'w', encoding='utf-8', newline='') if options['output'] else sys.stdout
+        except OSError as error:
+            raise CommandError(error)
+        try:
+            for piece in buffered(lines):
+                output.write(piece)
+        finally:
+            if output is not sys.stdout:
+                output.close()
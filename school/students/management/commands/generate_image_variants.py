@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from news.models import News
+from students.images import generate_variants, has_variants
+from students.models import Student
+
+
+class Command(BaseCommand):
+    help = 'Create resized WebP/JPEG variants for news images and profile pictures'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate variants that already exist')
+
+    def handle(self, *args, **options):
+        sources = [
+            (News, 'image'),
+            (Student, 'profile_picture'),
+        ]
+        for model, field_name in sources:
+            processed = 0
+            instances = model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+            for instance in instances.only('pk', field_name).iterator():
+                field_file = getattr(instance, field_name)
+                if options['force'] or not has_variants(field_file):
+                    if generate_variants(field_file.storage, field_file.name):
+                        processed += 1
+            self.stdout.write(self.style.SUCCESS(f"{model.__name__}: variants created for {processed} image(s)"))
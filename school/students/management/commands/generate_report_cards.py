@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from students.models import Student
+from students.reports import REPORT_CHUNK_SIZE, REPORT_FORMATS, check_format, generate_reports, stream_zip
+
+
+class Command(BaseCommand):
+    help = 'Write the report card of every (or every matching) student into a ZIP archive'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Path of the .zip file to write')
+        parser.add_argument('--format', choices=REPORT_FORMATS, default='html')
+        parser.add_argument('--category', choices=[choice for choice, label in Student.CATEGORY_CHOICES])
+        parser.add_argument('--year', type=int, choices=[choice for choice, label in Student.YEAR_CHOICES])
+        parser.add_argument('--department', choices=[choice for choice, label in Student.DEPARTMENT_CHOICES])
+        parser.add_argument('--chunk-size', type=int, default=REPORT_CHUNK_SIZE)
+        parser.add_argument('--workers', type=int, default=None, help='Rendering processes (default: CPU count)')
+
+    def handle(self, *args, **options):
+        try:
+            check_format(options['format'])
+        except ValueError as error:
+            raise CommandError(error)
+
+        students = Student.objects.all()
+        if options['category']:
+            students = students.filter(category=options['category'])
+        if options['year']:
+            students = students.filter(current_year=options['year'])
+        if options['department']:
+            students = students.filter(department=options['department'])
+
+        written = 0
+
+        def counted(reports):
+            nonlocal written
+            for report in reports:
+                written += 1
+                yield report
+
+        reports = generate_reports(
+            students, options['format'], chunk_size=options['chunk_size'], max_workers=options['workers']
+        )
+        try:
+            with open(options['output'], 'wb') as output:
+                for data in stream_zip(counted(reports)):
+                    output.write(data)
+        except OSError as error:
+            raise CommandError(error)
+        self.stdout.write(self.style.SUCCESS(f"{written} report card(s) written to {options['output']}"))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from students.importers import IMPORT_BATCH_SIZE, import_students
+
+
+class Command(BaseCommand):
+    help = 'Bulk import students from a CSV or XLSX file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path to a .csv or .xlsx file')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument('--workers', type=int, default=None, help='Password hashing processes (default: CPU count)')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], 'rb') as fileobj:
+                result = import_students(
+                    fileobj, options['path'], batch_size=options['batch_size'], max_workers=options['workers']
+                )
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+
+        for line, message in result.errors:
+            self.stderr.write(f"Line {line}: {message}")
+        self.stdout.write(self.style.SUCCESS(str(result)))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from students.statistics import rebuild_statistics
+
+
+class Command(BaseCommand):
+    help = 'Recompute the department/year and course enrollment statistics from the student and enrollment tables'
+
+    def handle(self, *args, **options):
+        classes, courses = rebuild_statistics()
+        self.stdout.write(self.style.SUCCESS(f"Statistics rebuilt for {classes} class(es) and {courses} course row(s)"))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from students.seed import SEED_BATCH_SIZE, seed_data
+
+
+class Command(BaseCommand):
+    help = 'Fill the database with deterministic, realistic-sized test data for load tests and benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=10000)
+        parser.add_argument('--courses', type=int, default=200)
+        parser.add_argument('--enrollments', type=int, default=150000)
+        parser.add_argument('--news', type=int, default=2000)
+        parser.add_argument('--announcements', type=int, default=500)
+        parser.add_argument('--seed', type=int, default=42, help='Random seed; the same seed gives the same data')
+        parser.add_argument('--batch-size', type=int, default=SEED_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            result = seed_data(
+                students=options['students'], courses=options['courses'], enrollments=options['enrollments'],
+                news=options['news'], announcements=options['announcements'], seed=options['seed'],
+                batch_size=options['batch_size'],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        self.stdout.write(self.style.SUCCESS(str(result)))
@@ -0,0 +1,106 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connections, transaction
+
+from news.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = (
+        'Copy every table from one configured database to another in batches, '
+        'e.g. from the legacy db.sqlite3 (SCHOOL_LEGACY_SQLITE) to PostgreSQL. '
+        'The target must already be migrated; its existing rows are replaced.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', default='legacy', help='Database alias to read from')
+        parser.add_argument('--target', default='default', help='Database alias to write to')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--noinput', action='store_false', dest='interactive')
+
+    def handle(self, *args, **options):
+        source, target = options['source'], options['target']
+        for alias in (source, target):
+            if alias not in connections:
+                raise CommandError(f"Database '{alias}' is not configured")
+        if source == target:
+            raise CommandError('Source and target must be different databases')
+
+        if options['interactive']:
+            answer = input(f"This replaces all data in '{target}' with the data in '{source}'. Continue? [y/N] ")
+            if answer.lower() != 'y':
+                raise CommandError('Transfer cancelled')
+
+        models = self.models_in_dependency_order()
+        with transaction.atomic(using=target):
+            # Children first, so foreign keys never point at deleted rows
+            for model in reversed(models):
+                model._base_manager.using(target).all()._raw_delete(target)
+            for model in models:
+                copied = self.copy_table(model, source, target, options['batch_size'])
+                self.stdout.write(f"{model._meta.label}: {copied} row(s)")
+            self.reset_sequences(models, target)
+            # The full-text index is no model: rebuild it from the copied rows
+            indexed = rebuild_index(using=target)
+            self.stdout.write(f"Search index: {indexed} document(s)")
+
+        self.stdout.write(self.style.SUCCESS('Transfer complete'))
+
+    def models_in_dependency_order(self):
+        models = [
+            model for model in apps.get_models(include_auto_created=True)
+            if model._meta.managed and not model._meta.proxy
+        ]
+        ordered = []
+
+        # Depth-first over foreign keys: referenced tables are copied first
+        def visit(model, path):
+            if model in ordered or model in path:
+                return
+            for field in model._meta.concrete_fields:
+                if field.is_relation and field.related_model in models:
+                    visit(field.related_model, path | {model})
+            ordered.append(model)
+
+        for model in models:
+            visit(model, set())
+        return ordered
+
+    def copy_table(self, model, source, target, batch_size):
+        # Raw INSERTs keep primary keys and auto_now values exactly as stored
+        connection = connections[target]
+        fields = model._meta.concrete_fields
+        columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+        placeholders = ', '.join(['%s'] * len(fields))
+        sql = f'INSERT INTO {connection.ops.quote_name(model._meta.db_table)} ({columns}) VALUES ({placeholders})'
+
+        rows = (
+            model._base_manager.using(source)
+            .order_by('pk')
+            .values_list(*[field.attname for field in fields])
+            .iterator(chunk_size=batch_size)
+        )
+        copied = 0
+        batch = []
+        with connection.cursor() as cursor:
+            for row in rows:
+                batch.append([
+                    field.get_db_prep_save(value, connection=connection) for field, value in zip(fields, row)
+                ])
+                if len(batch) == batch_size:
+                    cursor.executemany(sql, batch)
+                    copied += len(batch)
+                    batch = []
+            if batch:
+                cursor.executemany(sql, batch)
+                copied += len(batch)
+        return copied
+
+    def reset_sequences(self, models, target):
+        connection = connections[target]
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        if statements:
+            with connection.cursor() as cursor:
+                for statement in statements:
+                    cursor.execute(statement)
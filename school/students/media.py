@@ -0,0 +1,181 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+
+from school.static import file_etag, not_modified
+from .models import Student
+
+# Hand the file transfer to the front proxy: 'x-accel-redirect' (nginx),
+# 'x-sendfile' (Apache mod_xsendfile, lighttpd) or '' to stream from Django
+MEDIA_OFFLOAD = getattr(settings, 'MEDIA_OFFLOAD', '')
+
+# nginx `internal` location that maps onto MEDIA_ROOT, used with X-Accel-Redirect
+MEDIA_ACCEL_REDIRECT_PREFIX = getattr(settings, 'MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+
+# Browser cache lifetime for uploads; profile pictures are only cached privately
+MEDIA_CACHE_MAX_AGE = getattr(settings, 'MEDIA_CACHE_MAX_AGE', 60 * 60)
+
+PROFILE_PICTURES_DIR = 'profile_pictures/'
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def is_private(name):
+    return name.startswith(PROFILE_PICTURES_DIR)
+
+
+def can_view(request, name):
+    """Profile pictures, and their resized variants, are visible to their owner and to staff only."""
+    if not is_private(name):
+        return True
+    user = request.user
+    if not user.is_authenticated:
+        return False
+    if user.is_staff:
+        return True
+    picture = Student.objects.filter(user=user).values_list('profile_picture', flat=True).first()
+    if not picture:
+        return False
+    # profile_pictures/jane_image.jpg also covers profile_pictures/jane_image.thumbnail.webp
+    return name == picture or name.startswith(os.path.splitext(picture)[0] + '.')
+
+
+def parse_range(header, size):
+    """
+    Return (start, end) for a single satisfiable byte range, None when the
+    header is absent or unsupported (the whole file is sent), or raise
+    ValueError when the range cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        # bytes=-500: the last 500 bytes
+        length = int(last)
+        if not length:
+            raise ValueError
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start > end or start >= size:
+        raise ValueError
+    return start, end
+
+
+def if_range_matches(request, etag, last_modified):
+    if_range = request.headers.get('If-Range')
+    if if_range is None:
+        return True
+    if if_range.startswith('"'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == int(last_modified)
+
+
+class FileRange:
+    """
+    Part of an open file. Keeps fileno() so a WSGI server's file_wrapper can
+    still use sendfile(); it starts at the current offset and stops after
+    Content-Length bytes.
+    """
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def offload_response(name, path):
+    if MEDIA_OFFLOAD == 'x-accel-redirect':
+        header, value = 'X-Accel-Redirect', MEDIA_ACCEL_REDIRECT_PREFIX + quote(name)
+    else:
+        header, value = 'X-Sendfile', path
+    response = HttpResponse()
+    # Let the proxy pick the type from the file it serves
+    del response.headers['Content-Type']
+    response.headers[header] = value
+    return response
+
+
+def file_response(request, path, stat):
+    etag = file_etag(stat)
+    if not_modified(request, etag, stat.st_mtime):
+        response = HttpResponseNotModified()
+    else:
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        file = open(path, 'rb')
+        try:
+            byte_range = parse_range(request.headers.get('Range', ''), stat.st_size)
+        except ValueError:
+            file.close()
+            response = HttpResponse(status=416)
+            response.headers['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+
+        if byte_range and if_range_matches(request, etag, stat.st_mtime):
+            start, end = byte_range
+            response = FileResponse(FileRange(file, start, end - start + 1), content_type=content_type, status=206)
+            response.headers['Content-Length'] = end - start + 1
+            response.headers['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        else:
+            # Under WSGI, FileResponse goes through wsgi.file_wrapper, i.e. sendfile()
+            response = FileResponse(file, content_type=content_type)
+        response.headers['Accept-Ranges'] = 'bytes'
+    response.headers['ETag'] = etag
+    response.headers['Last-Modified'] = http_date(stat.st_mtime)
+    return response
+
+
+def serve_media(request, path):
+    """
+    Serve an uploaded file from MEDIA_ROOT. The transfer is offloaded to the
+    front proxy when MEDIA_OFFLOAD is set, otherwise Django streams it with
+    validators and byte-range support.
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    name = os.path.relpath(full_path, settings.MEDIA_ROOT).replace(os.sep, '/')
+    # A missing file and a forbidden one look the same, so names cannot be probed
+    if not can_view(request, name):
+        raise Http404
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    if MEDIA_OFFLOAD:
+        response = offload_response(name, full_path)
+    else:
+        response = file_response(request, full_path, stat)
+
+    if is_private(name):
+        patch_cache_control(response, private=True, max_age=MEDIA_CACHE_MAX_AGE)
+        patch_vary_headers(response, ('Cookie',))
+    else:
+        patch_cache_control(response, public=True, max_age=MEDIA_CACHE_MAX_AGE)
+    return response
@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+
+def remove_duplicate_enrollments(apps, schema_editor):
+    # Keep the oldest row of every (student, course) pair so the unique
+    # constraint can be created on existing databases.
+    Enrollment = apps.get_model('students', 'Enrollment')
+    db_alias = schema_editor.connection.alias
+    duplicates = (
+        Enrollment.objects.using(db_alias).values('student_id', 'course_id')
+        .annotate(first_id=models.Min('id'), rows=models.Count('id'))
+        .filter(rows__gt=1)
+    )
+    for pair in duplicates:
+        Enrollment.objects.using(db_alias).filter(
+            student_id=pair['student_id'], course_id=pair['course_id']
+        ).exclude(id=pair['first_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0009_course_enrollment'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_enrollments, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='enrollment',
+            constraint=models.UniqueConstraint(fields=('student', 'course'), name='unique_student_course_enrollment'),
+        ),
+    ]
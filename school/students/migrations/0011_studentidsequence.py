@@ -0,0 +1,41 @@
+# Generated by Django 5.1.15 on 2026-10-18 18:31
+
+from django.db import migrations, models
+from django.db.models.functions import Length
+
+STUDENT_ID_PREFIXES = ('1020101', '1020201')
+
+
+def seed_student_id_sequences(apps, schema_editor):
+    # Start each counter at the highest student ID already issued
+    Student = apps.get_model('students', 'Student')
+    StudentIdSequence = apps.get_model('students', 'StudentIdSequence')
+    db_alias = schema_editor.connection.alias
+    for prefix in STUDENT_ID_PREFIXES:
+        last_student_id = (
+            Student.objects.using(db_alias).filter(student_id__startswith=prefix)
+            .order_by(Length('student_id').desc(), '-student_id')
+            .values_list('student_id', flat=True)
+            .first()
+        )
+        number = last_student_id[len(prefix):] if last_student_id else ''
+        last_value = int(number) if number.isdigit() else 0
+        StudentIdSequence.objects.using(db_alias).create(prefix=prefix, last_value=last_value)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0010_enrollment_unique_student_course'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentIdSequence',
+            fields=[
+                ('prefix', models.CharField(max_length=10, primary_key=True, serialize=False)),
+                ('last_value', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_student_id_sequences, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.15 on 2026-10-18 18:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0011_studentidsequence'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['category', 'current_year', 'department'], name='student_class_idx'),
+        ),
+    ]
+
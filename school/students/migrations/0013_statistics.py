@@ -0,0 +1,88 @@
+# Generated by Django 5.1.15 on 2026-10-18 18:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Q, Sum
+
+
+def seed_statistics(apps, schema_editor):
+    # Same totals as `manage.py rebuild_statistics`, from the rows that exist now
+    Student = apps.get_model('students', 'Student')
+    Enrollment = apps.get_model('students', 'Enrollment')
+    DepartmentYearStats = apps.get_model('students', 'DepartmentYearStats')
+    CourseEnrollmentStats = apps.get_model('students', 'CourseEnrollmentStats')
+    db_alias = schema_editor.connection.alias
+
+    classes = {}
+    rows = Student.objects.using(db_alias).values('category', 'department', 'current_year').annotate(
+        student_count=Count('pk'), gpa_count=Count('gpa'), gpa_sum=Sum('gpa'), gpa_min=Min('gpa'), gpa_max=Max('gpa'),
+    ).order_by()
+    for row in rows:
+        row['department'] = row['department'] or ''
+        row['gpa_sum'] = row['gpa_sum'] or 0
+        classes[(row['category'], row['department'], row['current_year'])] = DepartmentYearStats(**row)
+
+    course_stats = []
+    rows = Enrollment.objects.using(db_alias).values(
+        'course_id', 'student__category', 'student__department', 'student__current_year'
+    ).annotate(enrollment_count=Count('pk'), completed_count=Count('pk', filter=Q(completed=True))).order_by()
+    for row in rows:
+        group = (row['student__category'], row['student__department'] or '', row['student__current_year'])
+        course_stats.append(CourseEnrollmentStats(
+            course_id=row['course_id'], category=group[0], department=group[1], current_year=group[2],
+            enrollment_count=row['enrollment_count'], completed_count=row['completed_count'],
+        ))
+        classes[group].enrollment_count += row['enrollment_count']
+        classes[group].completed_count += row['completed_count']
+
+    DepartmentYearStats.objects.using(db_alias).bulk_create(classes.values())
+    CourseEnrollmentStats.objects.using(db_alias).bulk_create(course_stats)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0012_student_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DepartmentYearStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(choices=[('Junior', 'Junior'), ('Senior', 'Senior')], max_length=10)),
+                ('department', models.CharField(blank=True, choices=[('ELE', 'Electrical Engineering'), ('MEC', 'Mechanical Engineering'), ('AUT', 'Automobile Engineering'), ('BLD', 'Building Technology'), ('WDW', 'Woodwork Technology'), ('PLB', 'Plumbing and Pipefitting'), ('CSC', 'Computer Science/ICT'), ('PNT', 'Painting and Decorating'), ('WLD', 'Welding and Fabrication'), ('TRV', 'Radio and Television (TRV) Electronic')], default='', max_length=3)),
+                ('current_year', models.PositiveIntegerField(choices=[(1, 1), (2, 2), (3, 3)])),
+                ('student_count', models.PositiveIntegerField(default=0)),
+                ('gpa_count', models.PositiveIntegerField(default=0)),
+                ('gpa_sum', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('gpa_min', models.DecimalField(blank=True, decimal_places=2, max_digits=4, null=True)),
+                ('gpa_max', models.DecimalField(blank=True, decimal_places=2, max_digits=4, null=True)),
+                ('enrollment_count', models.PositiveIntegerField(default=0)),
+                ('completed_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'department and year statistics',
+                'verbose_name_plural': 'department and year statistics',
+                'constraints': [models.UniqueConstraint(fields=('category', 'department', 'current_year'), name='unique_stats_class')],
+            },
+        ),
+        migrations.CreateModel(
+            name='CourseEnrollmentStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(choices=[('Junior', 'Junior'), ('Senior', 'Senior')], max_length=10)),
+                ('department', models.CharField(blank=True, choices=[('ELE', 'Electrical Engineering'), ('MEC', 'Mechanical Engineering'), ('AUT', 'Automobile Engineering'), ('BLD', 'Building Technology'), ('WDW', 'Woodwork Technology'), ('PLB', 'Plumbing and Pipefitting'), ('CSC', 'Computer Science/ICT'), ('PNT', 'Painting and Decorating'), ('WLD', 'Welding and Fabrication'), ('TRV', 'Radio and Television (TRV) Electronic')], default='', max_length=3)),
+                ('current_year', models.PositiveIntegerField(choices=[(1, 1), (2, 2), (3, 3)])),
+                ('enrollment_count', models.PositiveIntegerField(default=0)),
+                ('completed_count', models.PositiveIntegerField(default=0)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='enrollment_stats', to='students.course')),
+            ],
+            options={
+                'verbose_name': 'course enrollment statistics',
+                'verbose_name_plural': 'course enrollment statistics',
+                'constraints': [models.UniqueConstraint(fields=('course', 'category', 'department', 'current_year'), name='unique_course_stats_class')],
+            },
+        ),
+        migrations.RunPython(seed_statistics, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,6 @@
-from django.db import models
+from django.db import models, transaction, IntegrityError
+from django.db.models import F
+from django.db.models.functions import Length
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 import os
@@ -14,6 +16,51 @@ def user_profile_image_path(instance, filename):
     # Return the full path to the file
     return os.path.join('profile_pictures', filename)
 
+
+class StudentIdSequence(models.Model):
+    # One counter row per student ID prefix (junior/senior)
+    prefix = models.CharField(max_length=10, primary_key=True)
+    last_value = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.prefix}: {self.last_value}"
+
+    @classmethod
+    def reserve(cls, prefix, count=1):
+        """
+        Atomically reserve `count` consecutive numbers for `prefix` and return
+        them as a range. The counter row is bumped with a single UPDATE, so
+        concurrent callers never receive the same number.
+        """
+        if count < 1:
+            raise ValueError("count must be at least 1")
+        with transaction.atomic():
+            updated = cls.objects.filter(prefix=prefix).update(last_value=F('last_value') + count)
+            if not updated:
+                cls._create_counter(prefix)
+                cls.objects.filter(prefix=prefix).update(last_value=F('last_value') + count)
+            last_value = cls.objects.values_list('last_value', flat=True).get(prefix=prefix)
+        return range(last_value - count + 1, last_value + 1)
+
+    @classmethod
+    def _create_counter(cls, prefix):
+        # First use of a prefix: seed the counter from the highest existing ID.
+        # This is the only time the student table is scanned.
+        last_student_id = (
+            Student.objects.filter(student_id__startswith=prefix)
+            .order_by(Length('student_id').desc(), '-student_id')
+            .values_list('student_id', flat=True)
+            .first()
+        )
+        number = last_student_id[len(prefix):] if last_student_id else ''
+        try:
+            with transaction.atomic():
+                cls.objects.create(prefix=prefix, last_value=int(number) if number.isdigit() else 0)
+        except IntegrityError:
+            # Another request created the counter first
+            pass
+
+
 class Student(models.Model):
     GENDER_CHOICES = [
         ('M', 'Male'),
@@ -41,6 +88,12 @@ class Student(models.Model):
 
     YEAR_CHOICES = [(r, r) for r in range(1, 4)]
 
+    # Student ID prefix for each category
+    ID_PREFIXES = {
+        'Junior': '1020101',
+        'Senior': '1020201',
+    }
+
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='student_profile')
     student_id = models.CharField(max_length=15, unique=True)
     # user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='student_profile')
@@ -69,6 +122,13 @@ class Student(models.Model):
 
     date_joined = models.DateField(auto_now_add=True)
     last_updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Bulk course registration selects a class by category, year and department
+            models.Index(fields=['category', 'current_year', 'department'], name='student_class_idx'),
+        ]
+
  
     
     def save(self, *args, **kwargs):
@@ -82,33 +142,25 @@ class Student(models.Model):
         if not self.user.pk:  # Check if the user has not been saved yet
             self.user.save()  # Save the related User instance
 
-        # Determine the prefix for the student ID based on the category
-        prefix = '1020101' if self.category == 'Junior' else '1020201'
-
-        # If this is a new student, generate the student ID
+        # If this is a new student, allocate the next student ID for the category
         if not self.student_id:
-            # Get the last student ID based on the same category (junior/senior)
-            last_student = Student.objects.filter(category=self.category).order_by('student_id').last()
-
-            if last_student:
-                # Extract the numeric part of the student ID after the prefix
-                last_id_number = last_student.student_id[len(prefix):]
-                if last_id_number.isdigit():
-                    new_id_number = int(last_id_number) + 1
-                else:
-                    new_id_number = 1  # Fallback if the numeric part is not valid
-            else:
-                # Start from 1 if no student exists
-                new_id_number = 1
-
-            # Assign the new student ID with the prefix and the incremented number
-            self.student_id = f"{prefix}{str(new_id_number).zfill(3)}"  # Adds leading zeros to keep ID format consistent
+            self.student_id = self.allocate_student_ids(self.category)[0]
 
         # Save the Student instance
         super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.user.first_name} {self.user.last_name} ({self.student_id})"
+
+    @classmethod
+    def allocate_student_ids(cls, category, count=1):
+        """
+        Reserve `count` new student IDs for the category in one step, e.g. for
+        a bulk import, and return them as a list of strings.
+        """
+        prefix = cls.ID_PREFIXES['Junior'] if category == 'Junior' else cls.ID_PREFIXES['Senior']
+        # Adds leading zeros to keep ID format consistent
+        return [f"{prefix}{str(number).zfill(3)}" for number in StudentIdSequence.reserve(prefix, count)]
     
     
 
@@ -134,6 +186,76 @@ class Enrollment(models.Model):
     date_enrolled = models.DateField(auto_now_add=True)
     completed = models.BooleanField(default=False)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'course'], name='unique_student_course_enrollment'),
+        ]
+
     def __str__(self):
         # Access the User model via the Student model
         return f"{self.student.user.username} enrolled in {self.course.course_name}"
+
+
+class DepartmentYearStats(models.Model):
+    """
+    Running totals for one class (category, department, year), kept up to
+    date by students.statistics so reports never aggregate Student or
+    Enrollment. Junior classes have an empty department.
+    """
+    category = models.CharField(max_length=10, choices=Student.CATEGORY_CHOICES)
+    department = models.CharField(max_length=3, choices=Student.DEPARTMENT_CHOICES, blank=True, default='')
+    current_year = models.PositiveIntegerField(choices=Student.YEAR_CHOICES)
+
+    student_count = models.PositiveIntegerField(default=0)
+    # Students with a GPA, and the sum of their GPAs, give the mean
+    gpa_count = models.PositiveIntegerField(default=0)
+    gpa_sum = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    gpa_min = models.DecimalField(max_digits=4, decimal_places=2, blank=True, null=True)
+    gpa_max = models.DecimalField(max_digits=4, decimal_places=2, blank=True, null=True)
+    enrollment_count = models.PositiveIntegerField(default=0)
+    completed_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'department and year statistics'
+        verbose_name_plural = 'department and year statistics'
+        constraints = [
+            models.UniqueConstraint(fields=['category', 'department', 'current_year'], name='unique_stats_class'),
+        ]
+
+    def __str__(self):
+        return f"{self.category} {self.department or '-'} year {self.current_year}"
+
+    @property
+    def gpa_mean(self):
+        return round(self.gpa_sum / self.gpa_count, 2) if self.gpa_count else None
+
+    @property
+    def completion_rate(self):
+        return self.completed_count / self.enrollment_count if self.enrollment_count else None
+
+
+class CourseEnrollmentStats(models.Model):
+    """Enrollments in one course from one class, maintained like DepartmentYearStats."""
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='enrollment_stats')
+    category = models.CharField(max_length=10, choices=Student.CATEGORY_CHOICES)
+    department = models.CharField(max_length=3, choices=Student.DEPARTMENT_CHOICES, blank=True, default='')
+    current_year = models.PositiveIntegerField(choices=Student.YEAR_CHOICES)
+
+    enrollment_count = models.PositiveIntegerField(default=0)
+    completed_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'course enrollment statistics'
+        verbose_name_plural = 'course enrollment statistics'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['course', 'category', 'department', 'current_year'], name='unique_course_stats_class'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.course.course_code}: {self.category} {self.department or '-'} year {self.current_year}"
+
+    @property
+    def completion_rate(self):
+        return self.completed_count / self.enrollment_count if self.enrollment_count else None
@@ -0,0 +1,130 @@
+import zipfile
+from itertools import islice
+
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import Enrollment
+from .workers import process_pool
+
+try:
+    import weasyprint
+except ImportError:  # PDF output is optional, HTML reports need nothing extra
+    weasyprint = None
+
+# Students fetched and handed to the pool at a time; bounds the memory used
+REPORT_CHUNK_SIZE = 200
+
+REPORT_FORMATS = ('html', 'pdf')
+
+
+def check_format(report_format):
+    if report_format not in REPORT_FORMATS:
+        raise ValueError(f"Unknown report format {report_format!r}, use one of {', '.join(REPORT_FORMATS)}")
+    if report_format == 'pdf' and weasyprint is None:
+        raise ValueError("PDF reports need the weasyprint package; install it or use the html format")
+
+
+def _chunks(queryset, size):
+    students = queryset.select_related('user').order_by('pk').iterator(chunk_size=size)
+    while chunk := list(islice(students, size)):
+        yield chunk
+
+
+def report_data(students, issued):
+    """
+    Plain, picklable report contents for a chunk of students, read with one
+    enrollment query for the whole chunk.
+    """
+    enrollments = {}
+    rows = (
+        Enrollment.objects.filter(student__in=students)
+        .order_by('course__course_code')
+        .values_list('student_id', 'course__course_code', 'course__course_name', 'course__credits', 'completed')
+    )
+    for student_id, code, name, credits, completed in rows:
+        enrollments.setdefault(student_id, []).append(
+            {'code': code, 'name': name, 'credits': credits, 'completed': completed}
+        )
+
+    for student in students:
+        courses = enrollments.get(student.pk, [])
+        yield {
+            'student_id': student.student_id,
+            'first_name': student.user.first_name,
+            'last_name': student.user.last_name,
+            'category': student.category,
+            'department': student.get_department_display() if student.department else '',
+            'current_year': student.current_year,
+            'gpa': student.gpa,
+            'courses': courses,
+            'credits_enrolled': sum(course['credits'] for course in courses),
+            'credits_completed': sum(course['credits'] for course in courses if course['completed']),
+            'issued': issued,
+        }
+
+
+def render_report(data, report_format='html'):
+    """Render one report; runs in a worker process. Returns (file name, content)."""
+    html = render_to_string('reports/report_card.html', data)
+    if report_format == 'pdf':
+        return f"{data['student_id']}.pdf", weasyprint.HTML(string=html).write_pdf()
+    return f"{data['student_id']}.html", html.encode()
+
+
+def generate_reports(queryset, report_format='html', chunk_size=REPORT_CHUNK_SIZE, max_workers=None):
+    """
+    Yield (file name, content) for the report card of every student in
+    `queryset`. Students are read a chunk at a time and each chunk is
+    rendered across a process pool while the next one is fetched. Closing
+    the generator, e.g. when a download is aborted, cancels the reports not
+    started yet and shuts the pool down.
+    """
+    check_format(report_format)
+    issued = timezone.localdate()
+    pool = process_pool(max_workers)
+    try:
+        pending = None
+        for students in _chunks(queryset, chunk_size):
+            data = list(report_data(students, issued))
+            rendering = [pool.submit(render_report, item, report_format) for item in data]
+            if pending:
+                yield from (future.result() for future in pending)
+            pending = rendering
+        if pending:
+            yield from (future.result() for future in pending)
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+class _ZipStream:
+    """Write-only file object that collects what ZipFile writes until it is drained."""
+
+    def __init__(self):
+        self.buffer = []
+
+    def write(self, data):
+        self.buffer.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.buffer)
+        self.buffer.clear()
+        return data
+
+
+def stream_zip(files):
+    """
+    Yield a ZIP archive of (name, content) pairs piece by piece. The
+    archive is written without seeking, so only the current member is held
+    in memory.
+    """
+    stream = _ZipStream()
+    with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in files:
+            archive.writestr(name, content)
+            yield stream.drain()
+    yield stream.drain()
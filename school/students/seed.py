@@ -0,0 +1,164 @@
+import datetime
+import random
+from dataclasses import dataclass
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from news.cache import invalidate_homepage
+from news.models import Announcement, News
+from news.search import rebuild_index
+from news.utils import split_paragraphs
+from .cache import invalidate_dashboards
+from .models import Course, Enrollment, Student
+from .statistics import rebuild_statistics
+
+# Rows per INSERT while seeding
+SEED_BATCH_SIZE = 1000
+
+# Every seeded account uses this password, so benchmarks can log in
+SEED_PASSWORD = 'seed-password'
+
+SEED_USERNAME_PREFIX = 'seed-'
+
+FIRST_NAMES = ['Aisha', 'Bello', 'Chinedu', 'Damilola', 'Emeka', 'Fatima', 'Garba', 'Halima', 'Ibrahim', 'Jumoke',
+               'Kabiru', 'Lami', 'Musa', 'Ngozi', 'Obinna', 'Rukayya', 'Sani', 'Tunde', 'Usman', 'Zainab']
+LAST_NAMES = ['Abdullahi', 'Adeyemi', 'Bakare', 'Danjuma', 'Eze', 'Garba', 'Ibrahim', 'Lawal', 'Mohammed', 'Nwosu',
+              'Okafor', 'Olawale', 'Sule', 'Umar', 'Yusuf']
+WORDS = ['school', 'students', 'examination', 'results', 'sports', 'workshop', 'technology', 'welding', 'ICT',
+         'electrical', 'parents', 'meeting', 'holiday', 'resumption', 'graduation', 'award', 'science', 'project',
+         'training', 'visit', 'library', 'practical', 'timetable', 'term', 'registration', 'uniform', 'fees']
+
+
+@dataclass
+class SeedResult:
+    students: int = 0
+    courses: int = 0
+    enrollments: int = 0
+    news: int = 0
+    announcements: int = 0
+
+    def __str__(self):
+        return (f"Seeded {self.students} students, {self.courses} courses, {self.enrollments} enrollments, "
+                f"{self.news} news items and {self.announcements} announcements")
+
+
+def _sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def _content(rng):
+    paragraphs = [' '.join(_sentence(rng, rng.randint(6, 14)) for _ in range(rng.randint(2, 5)))
+                  for _ in range(rng.randint(2, 6))]
+    return '\n\n'.join(paragraphs)
+
+
+def seed_data(students=10000, courses=200, enrollments=150000, news=2000, announcements=500, seed=42,
+              batch_size=SEED_BATCH_SIZE):
+    """
+    Fill the database with a deterministic, realistic-sized data set: the
+    same arguments always produce the same rows. Everything is written with
+    batched bulk inserts; the statistics and search index, which those skip,
+    are rebuilt at the end.
+    """
+    if User.objects.filter(username__startswith=SEED_USERNAME_PREFIX).exists():
+        raise ValueError("The database already holds seeded data")
+    rng = random.Random(seed)
+    result = SeedResult()
+    # One hash for every account: hashing 10k passwords would dominate the run. The
+    # fixed salt keeps the data reproducible and is long enough that logging in
+    # does not rehash (and so change) the password
+    password = make_password(SEED_PASSWORD, salt='SeedDataSeedDataSeedDa')
+    now = timezone.now()
+
+    with transaction.atomic():
+        users = [
+            User(
+                username=f'{SEED_USERNAME_PREFIX}{number:06d}', password=password,
+                first_name=rng.choice(FIRST_NAMES), last_name=rng.choice(LAST_NAMES),
+                email=f'{SEED_USERNAME_PREFIX}{number:06d}@example.com',
+            )
+            for number in range(students)
+        ]
+        User.objects.bulk_create(users, batch_size=batch_size)
+        users = list(User.objects.filter(username__startswith=SEED_USERNAME_PREFIX).order_by('username'))
+
+        categories = [rng.choice(['Junior', 'Senior']) for _ in users]
+        student_ids = {
+            category: iter(Student.allocate_student_ids(category, categories.count(category)))
+            for category in ('Junior', 'Senior')
+        }
+        departments = [code for code, label in Student.DEPARTMENT_CHOICES]
+        rows = []
+        for user, category in zip(users, categories):
+            year = rng.randint(1, 3)
+            rows.append(Student(
+                user=user, student_id=next(student_ids[category]), category=category,
+                department=rng.choice(departments) if category == 'Senior' else None,
+                enrollment_year=year, current_year=year,
+                gpa=round(rng.uniform(1.0, 5.0), 2) if rng.random() < 0.9 else None,
+                date_of_birth=datetime.date(2005, 1, 1) + datetime.timedelta(days=rng.randint(0, 2000)),
+                gender=rng.choice('MF'), address=f'{rng.randint(1, 200)} {rng.choice(LAST_NAMES)} Street',
+                phone_number=f'080{rng.randint(10000000, 99999999)}', father_name=rng.choice(FIRST_NAMES),
+                mother_name=rng.choice(FIRST_NAMES), parent_phone_number=f'081{rng.randint(10000000, 99999999)}',
+                emergency_contact_name=rng.choice(FIRST_NAMES), emergency_contact_relationship='Parent',
+                emergency_contact_phone_number=f'070{rng.randint(10000000, 99999999)}',
+            ))
+        Student.objects.bulk_create(rows, batch_size=batch_size)
+        result.students = len(rows)
+
+        existing_codes = set(Course.objects.values_list('course_code', flat=True))
+        course_rows = []
+        for number in range(courses):
+            level = 'JUN' if number % 2 else 'SEN'
+            code = f'S{level[0]}{number:04d}'
+            if code not in existing_codes:
+                course_rows.append(Course(
+                    course_code=code, course_name=f'{rng.choice(WORDS).capitalize()} {rng.choice(WORDS)} {number}',
+                    description=_sentence(rng, 12), credits=rng.randint(1, 4), level=level,
+                ))
+        Course.objects.bulk_create(course_rows, batch_size=batch_size)
+        result.courses = len(course_rows)
+
+        # Each student takes a similar number of distinct courses at their level
+        student_pks = list(Student.objects.filter(user__in=users).order_by('student_id').values_list('pk', 'category'))
+        course_pks = {
+            level: list(Course.objects.filter(level=level, course_code__startswith='S').order_by('pk')
+                        .values_list('pk', flat=True))
+            for level in ('JUN', 'SEN')
+        }
+        per_student = enrollments // max(len(student_pks), 1)
+        extra = enrollments - per_student * len(student_pks)
+        batch = []
+        for index, (student_pk, category) in enumerate(student_pks):
+            available = course_pks['JUN' if category == 'Junior' else 'SEN']
+            count = min(per_student + (1 if index < extra else 0), len(available))
+            for course_pk in rng.sample(available, count):
+                batch.append(Enrollment(student_id=student_pk, course_id=course_pk, completed=rng.random() < 0.3))
+            if len(batch) >= batch_size:
+                Enrollment.objects.bulk_create(batch, batch_size=batch_size, ignore_conflicts=True)
+                result.enrollments += len(batch)
+                batch = []
+        Enrollment.objects.bulk_create(batch, batch_size=batch_size, ignore_conflicts=True)
+        result.enrollments += len(batch)
+
+        for model, count, field in ((News, news, 'news'), (Announcement, announcements, 'announcements')):
+            items = []
+            for number in range(count):
+                content = _content(rng)
+                items.append(model(
+                    title=_sentence(rng, rng.randint(4, 9))[:-1],
+                    time=now - datetime.timedelta(hours=number * 7 + rng.randint(0, 6)),
+                    content=content, paragraphs=split_paragraphs(content),
+                ))
+            model.objects.bulk_create(items, batch_size=batch_size)
+            setattr(result, field, len(items))
+
+        rebuild_statistics()
+        rebuild_index()
+
+    invalidate_dashboards([student_pk for student_pk, category in student_pks])
+    invalidate_homepage()
+    return result
@@ -0,0 +1,123 @@
+import atexit
+import logging
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.db import DatabaseError, connections, router
+
+logger = logging.getLogger(__name__)
+
+# Seconds an updated session may wait in memory before it is written to the database
+SESSION_WRITE_BEHIND_INTERVAL = getattr(settings, 'SESSION_WRITE_BEHIND_INTERVAL', 5)
+
+
+class SessionWriter:
+    """
+    Per-process queue of session rows waiting to be written. Several updates
+    to one session between two flushes become a single UPDATE; a background
+    thread flushes the queue every SESSION_WRITE_BEHIND_INTERVAL seconds and
+    once more at exit.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread = None
+
+    def enqueue(self, obj):
+        with self.lock:
+            self.pending[obj.session_key] = obj
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='session-writer', daemon=True)
+                self.thread.start()
+
+    def discard(self, session_key):
+        # A deleted session must not be brought back by a queued write
+        with self.lock:
+            self.pending.pop(session_key, None)
+
+    def run(self):
+        while True:
+            self.wakeup.wait(self.interval)
+            self.wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        for obj in pending.values():
+            using = router.db_for_write(type(obj), instance=obj)
+            try:
+                # The row exists: sessions are created synchronously
+                updated = type(obj).objects.using(using).filter(session_key=obj.session_key).update(
+                    session_data=obj.session_data, expire_date=obj.expire_date
+                )
+                if not updated:
+                    logger.info("Session %s was deleted before its update was written", obj.session_key[:8])
+            except DatabaseError:
+                logger.exception("Could not write session %s", obj.session_key[:8])
+        if threading.current_thread() is self.thread:
+            connections.close_all()
+
+
+session_writer = SessionWriter(SESSION_WRITE_BEHIND_INTERVAL)
+atexit.register(session_writer.flush)
+
+
+class SessionStore(CachedDBStore):
+    """
+    Cached database sessions that write updates behind. The cache is always
+    written at once and is what requests read; the database copy of an
+    existing session is updated in the background, so a busy request costs
+    no session query at all. New sessions, logins and logouts, and saves
+    made inside a transaction, are still written synchronously.
+    """
+
+    def _auth(self, data):
+        return data.get(SESSION_KEY), data.get(HASH_SESSION_KEY)
+
+    def load(self):
+        data = super().load()
+        # The login the database copy holds; a save that changes it is written through
+        self._stored_auth = self._auth(data)
+        return data
+
+    def _save_now(self, must_create):
+        # An older queued write must not overwrite this one
+        session_writer.discard(self.session_key)
+        super().save(must_create)
+        self._stored_auth = self._auth(self._get_session())
+
+    def save(self, must_create=False):
+        if must_create or self.session_key is None:
+            return self._save_now(must_create)
+        data = self._get_session()
+        if self._auth(data) != getattr(self, '_stored_auth', None):
+            # Any worker may get the next request, e.g. the redirect after a
+            # login, and must not find the session logged out in the database
+            return self._save_now(must_create)
+        if connections[router.db_for_write(self.model)].in_atomic_block:
+            # Inside a transaction (ATOMIC_REQUESTS, tests) the write must be part of it
+            return self._save_now(must_create)
+        try:
+            self._cache.set(self.cache_key, data, self.get_expiry_age())
+        except Exception:
+            # Without a cached copy the database one must be current
+            logger.exception("Error saving to cache (%s)", self._cache)
+            return self._save_now(must_create)
+        session_writer.enqueue(self.create_model_instance(data))
+
+    async def asave(self, must_create=False):
+        await sync_to_async(self.save)(must_create)
+
+    def delete(self, session_key=None):
+        session_writer.discard(session_key or self.session_key)
+        super().delete(session_key)
+
+    async def adelete(self, session_key=None):
+        await sync_to_async(self.delete)(session_key)
@@ -0,0 +1,113 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import statistics
+from .auth import invalidate_user
+from .cache import invalidate_dashboards
+from .catalog import invalidate_catalog
+from .images import schedule_variants
+from .models import Course, Enrollment, Student
+
+
+@receiver([post_save, post_delete], sender=Enrollment)
+def enrollment_changed(sender, instance, **kwargs):
+    invalidate_dashboards([instance.student_id])
+
+
+@receiver([post_save, post_delete], sender=Student)
+def student_changed(sender, instance, **kwargs):
+    invalidate_dashboards([instance.pk])
+    # The cached request.user carries the student profile
+    invalidate_user(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=settings.AUTH_USER_MODEL)
+def user_changed(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=Student)
+def profile_picture_uploaded(sender, instance, **kwargs):
+    schedule_variants(instance.profile_picture)
+
+
+@receiver(post_save, sender=Course)
+def course_changed(sender, instance, **kwargs):
+    # Deleted courses cascade to their enrollments, which invalidate themselves
+    invalidate_dashboards(Enrollment.objects.filter(course=instance).values_list('student_id', flat=True))
+
+
+@receiver([post_save, post_delete], sender=Course)
+def course_catalog_changed(sender, instance, **kwargs):
+    invalidate_catalog()
+
+
+@receiver(pre_save, sender=Student)
+def remember_student_class(sender, instance, raw=False, **kwargs):
+    # The statistics need the values being replaced
+    if instance.pk and not raw:
+        instance._stats_previous = (
+            Student.objects.filter(pk=instance.pk).values_list('category', 'department', 'current_year', 'gpa').first()
+        )
+
+
+@receiver(post_save, sender=Student)
+def update_class_statistics(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_stats_previous', None)
+    group, gpa = statistics.group_of(instance), statistics.as_gpa(instance.gpa)
+    with transaction.atomic():
+        if created or previous is None:
+            statistics.add_student(group, gpa)
+            return
+        category, department, current_year, old_gpa = previous
+        old_group = (category, department or '', current_year)
+        if (old_group, old_gpa) == (group, gpa):
+            return
+        statistics.add_student(old_group, old_gpa, sign=-1)
+        statistics.add_student(group, gpa)
+        if old_group != group:
+            statistics.move_enrollments(instance.pk, old_group, group)
+
+
+@receiver(post_delete, sender=Student)
+def remove_from_class_statistics(sender, instance, **kwargs):
+    # Its enrollments are deleted first and remove themselves
+    statistics.add_student(statistics.group_of(instance), statistics.as_gpa(instance.gpa), sign=-1)
+
+
+@receiver(pre_save, sender=Enrollment)
+def remember_enrollment(sender, instance, raw=False, **kwargs):
+    if instance.pk and not raw:
+        instance._stats_previous = (
+            Enrollment.objects.filter(pk=instance.pk).values_list('student_id', 'course_id', 'completed').first()
+        )
+
+
+@receiver(post_save, sender=Enrollment)
+def update_enrollment_statistics(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_stats_previous', None)
+    current = (instance.student_id, instance.course_id, instance.completed)
+    if not created and previous == current:
+        return
+    with transaction.atomic():
+        if not created and previous is not None:
+            student_id, course_id, completed = previous
+            old_group = statistics.group_of(
+                instance.student if student_id == instance.student_id else Student.objects.get(pk=student_id)
+            )
+            statistics.add_enrollments(old_group, course_id, 1, int(completed), sign=-1)
+        statistics.add_enrollments(statistics.group_of(instance.student), instance.course_id, 1, int(instance.completed))
+
+
+@receiver(post_delete, sender=Enrollment)
+def remove_enrollment_statistics(sender, instance, **kwargs):
+    statistics.add_enrollments(
+        statistics.group_of(instance.student), instance.course_id, 1, int(instance.completed), sign=-1
+    )
+
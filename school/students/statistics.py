@@ -0,0 +1,170 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Max, Min, Q, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, Least
+
+from .catalog import invalidate_catalog
+from .models import CourseEnrollmentStats, DepartmentYearStats, Enrollment, Student
+
+# Statistics are kept per class: (category, department, current_year)
+GROUP_FIELDS = ('category', 'department', 'current_year')
+
+
+def group_of(student):
+    # Juniors have no department; the summary tables store '' so the unique constraints hold
+    return student.category, student.department or '', student.current_year
+
+
+def as_gpa(value):
+    # Assigned values may still be floats or strings until the row is read back
+    return None if value is None else Decimal(str(value)).quantize(Decimal('0.01'))
+
+
+def _group_filter(group, prefix=''):
+    category, department, current_year = group
+    lookups = {f'{prefix}category': category, f'{prefix}current_year': current_year}
+    if department:
+        lookups[f'{prefix}department'] = department
+    else:
+        lookups[f'{prefix}department__isnull'] = True
+    return Q(**lookups)
+
+
+def _group_kwargs(group):
+    return dict(zip(GROUP_FIELDS, group))
+
+
+def _gpa(value):
+    return Value(value, output_field=DecimalField(max_digits=4, decimal_places=2))
+
+
+def _stats_row(group):
+    return DepartmentYearStats.objects.get_or_create(**_group_kwargs(group))[0].pk
+
+
+def add_student(group, gpa, sign=1):
+    """Add (sign=1) or remove (sign=-1) one student from the totals of `group`."""
+    updates = {'student_count': F('student_count') + sign}
+    if gpa is not None:
+        updates['gpa_count'] = F('gpa_count') + sign
+        updates['gpa_sum'] = F('gpa_sum') + sign * gpa
+        if sign > 0:
+            updates['gpa_min'] = Least(Coalesce('gpa_min', _gpa(gpa)), _gpa(gpa))
+            updates['gpa_max'] = Greatest(Coalesce('gpa_max', _gpa(gpa)), _gpa(gpa))
+    DepartmentYearStats.objects.filter(pk=_stats_row(group)).update(**updates)
+
+    if gpa is not None and sign < 0:
+        # A minimum or maximum cannot be taken back; re-read it from the class (indexed)
+        bounds = Student.objects.filter(_group_filter(group)).aggregate(gpa_min=Min('gpa'), gpa_max=Max('gpa'))
+        DepartmentYearStats.objects.filter(**_group_kwargs(group)).update(**bounds)
+
+
+def add_enrollments(group, course_id, enrollments, completed, sign=1):
+    """Add or remove `enrollments` enrollments in one course, `completed` of them completed."""
+    changes = {
+        'enrollment_count': F('enrollment_count') + sign * enrollments,
+        'completed_count': F('completed_count') + sign * completed,
+    }
+    DepartmentYearStats.objects.filter(pk=_stats_row(group)).update(**changes)
+    key = dict(course_id=course_id, **_group_kwargs(group))
+    if sign > 0:
+        CourseEnrollmentStats.objects.get_or_create(**key)
+    # When a course is deleted its statistics may already be gone: nothing to update then
+    CourseEnrollmentStats.objects.filter(**key).update(**changes)
+    # The course catalog shows the enrollment counts
+    invalidate_catalog()
+
+
+def move_enrollments(student_id, old_group, new_group):
+    """Move a student's enrollments to the class they now belong to."""
+    per_course = (
+        Enrollment.objects.filter(student_id=student_id)
+        .values('course_id')
+        .annotate(enrollments=Count('pk'), completed=Count('pk', filter=Q(completed=True)))
+    )
+    for row in per_course:
+        add_enrollments(old_group, row['course_id'], row['enrollments'], row['completed'], sign=-1)
+        add_enrollments(new_group, row['course_id'], row['enrollments'], row['completed'])
+
+
+def _aggregate(student_filter=Q(), enrollment_filter=Q()):
+    """Build, without saving, the summary rows for the students matching the filters."""
+    classes = {}
+    rows = (
+        Student.objects.filter(student_filter)
+        .values(*GROUP_FIELDS)
+        .annotate(
+            student_count=Count('pk'),
+            gpa_count=Count('gpa'),
+            gpa_sum=Coalesce(Sum('gpa'), _gpa(0)),
+            gpa_min=Min('gpa'),
+            gpa_max=Max('gpa'),
+        )
+        .order_by()
+    )
+    for row in rows:
+        row['department'] = row['department'] or ''
+        classes[tuple(row[field] for field in GROUP_FIELDS)] = DepartmentYearStats(**row)
+
+    course_stats = []
+    rows = (
+        Enrollment.objects.filter(enrollment_filter)
+        .values('course_id', *(f'student__{field}' for field in GROUP_FIELDS))
+        .annotate(enrollment_count=Count('pk'), completed_count=Count('pk', filter=Q(completed=True)))
+        .order_by()
+    )
+    for row in rows:
+        group = (row['student__category'], row['student__department'] or '', row['student__current_year'])
+        course_stats.append(CourseEnrollmentStats(
+            course_id=row['course_id'], enrollment_count=row['enrollment_count'],
+            completed_count=row['completed_count'], **_group_kwargs(group),
+        ))
+        stats = classes[group]
+        stats.enrollment_count += row['enrollment_count']
+        stats.completed_count += row['completed_count']
+    return list(classes.values()), course_stats
+
+
+def refresh_groups(groups):
+    """
+    Recompute the summaries of the given classes from scratch, e.g. after a
+    bulk insert that sent no signals. Each class is read through the
+    student_class_idx index.
+    """
+    groups = set(groups)
+    if not groups:
+        return
+    student_filter = Q()
+    enrollment_filter = Q()
+    summary_filter = Q()
+    for group in groups:
+        student_filter |= _group_filter(group)
+        enrollment_filter |= _group_filter(group, 'student__')
+        summary_filter |= Q(**_group_kwargs(group))
+
+    with transaction.atomic():
+        classes, course_stats = _aggregate(student_filter, enrollment_filter)
+        DepartmentYearStats.objects.filter(summary_filter).delete()
+        CourseEnrollmentStats.objects.filter(summary_filter).delete()
+        DepartmentYearStats.objects.bulk_create(classes)
+        CourseEnrollmentStats.objects.bulk_create(course_stats)
+        invalidate_catalog()
+
+
+def rebuild_statistics():
+    """Replace every summary row; returns the number of classes and course rows written."""
+    with transaction.atomic():
+        classes, course_stats = _aggregate()
+        DepartmentYearStats.objects.all().delete()
+        CourseEnrollmentStats.objects.all().delete()
+        DepartmentYearStats.objects.bulk_create(classes)
+        CourseEnrollmentStats.objects.bulk_create(course_stats)
+        invalidate_catalog()
+    return len(classes), len(course_stats)
+
+
+def class_groups(student_ids):
+    """The classes the given students belong to."""
+    rows = Student.objects.filter(pk__in=student_ids).values_list(*GROUP_FIELDS).distinct()
+    return {(category, department or '', current_year) for category, department, current_year in rows}
@@ -0,0 +1,36 @@
+from django import template
+from django.utils.html import format_html
+
+from students.images import available_variants, srcset, variant_name
+
+register = template.Library()
+
+
+def _fallback(variants):
+    # For browsers without srcset: the medium variant, or the largest one of an image narrower than that
+    return 'medium' if 'medium' in dict(variants) else variants[-1][0]
+
+
+@register.simple_tag
+def responsive_image(field_file, alt='', css_class='', sizes='100vw'):
+    """
+    Render an uploaded image as a <picture> with WebP and JPEG srcsets.
+    Falls back to the original file while its variants are still being made,
+    and for images narrower than the smallest variant.
+
+        {% responsive_image news.image alt=news.title css_class="img-fluid" sizes="25vw" %}
+    """
+    variants = available_variants(field_file)
+    if not variants:
+        return format_html('<img src="{}" alt="{}" class="{}">', field_file.url, alt, css_class)
+
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}" class="{}" loading="lazy">'
+        '</picture>',
+        srcset(field_file, 'webp', variants), sizes,
+        field_file.storage.url(variant_name(field_file.name, _fallback(variants), 'jpg')),
+        srcset(field_file, 'jpg', variants), sizes,
+        alt, css_class,
+    )
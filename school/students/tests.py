@@ -1,3 +1,732 @@
-from django.test import TestCase
+import csv
+import datetime
+import importlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.storage import FileSystemStorage
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, connection, connections
+from django.db.models import Sum
+from django.db.models.fields.files import FieldFile
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from PIL import Image as PILImage
+
+from news.models import News
+from news.search import SearchResults, get_backend
+
+from . import paginator, reports, sessions, throttle
+from .auth import user_cache_key
+from .benchmarks import (
+    ROUTES, TEMPLATE_ROUTES, benchmark_settings, fixtures, regressions, run_benchmarks, run_template_benchmarks,
+)
+from .enrollments import bulk_enroll
+from .exports import STUDENT_EXPORT_FIELDS, buffered, export_lines, export_response
+from .forms import StudentImportForm
+from .images import available_variants, generate_variants
+from .importers import IMPORT_BATCH_SIZE, import_students
+from .models import Course, CourseEnrollmentStats, DepartmentYearStats, Enrollment, Student, StudentIdSequence
+from .paginator import EstimatedCountPaginator, estimate_row_count
+from .reports import generate_reports, stream_zip
+from .seed import SEED_PASSWORD, seed_data
+from .sessions import SessionWriter
+from .statistics import rebuild_statistics
+from .templatetags.responsive_images import responsive_image
+
+
+# The production session and user resolution, which needs a cache shared by the workers
+CACHED_SESSIONS = {
+    'SESSION_ENGINE': 'students.sessions',
+    'AUTHENTICATION_BACKENDS': ['students.auth.CachedModelBackend'],
+}
+
+
+def make_student(username, category='Junior', **fields):
+    user = User.objects.create_user(username, password='x')
+    return Student.objects.create(
+        user=user, date_of_birth=datetime.date(2005, 1, 1), gender='F', address='-', category=category,
+        department='ELE' if category == 'Senior' else None, father_name='-', mother_name='-',
+        parent_phone_number='-', emergency_contact_name='-', emergency_contact_relationship='-',
+        emergency_contact_phone_number='-', **fields,
+    )
+
+
+class QueryPlanMixin:
+    """Assertions on SQLite's EXPLAIN QUERY PLAN output."""
+
+    def assertUsesIndex(self, queryset):
+        # Every table access in the plan must go through an index
+        plan = queryset.explain()
+        steps = [line for line in plan.splitlines() if ' SCAN ' in line or ' SEARCH ' in line]
+        self.assertTrue(steps, f"No table access in the plan:\n{plan}")
+        for step in steps:
+            self.assertIn('USING', step, f"Full table scan:\n{plan}")
+
+
+class HotQueryIndexTests(QueryPlanMixin, TestCase):
+    def test_bulk_registration_class_filter(self):
+        students = Student.objects.filter(category='Senior', current_year=2, department='ELE')
+        self.assertUsesIndex(students)
+
+    def test_enrollment_pair_lookup(self):
+        enrollments = Enrollment.objects.filter(student_id=1, course_id=1)
+        self.assertUsesIndex(enrollments)
+
+    def test_dashboard_enrollments(self):
+        enrollments = Enrollment.objects.filter(student_id=1).select_related('course')
+        self.assertUsesIndex(enrollments)
+
+    def test_bulk_enrollment_diff_query(self):
+        students = Student.objects.filter(category='Senior', current_year=1)
+        courses = Course.objects.filter(pk__in=[1, 2, 3])
+        enrollments = Enrollment.objects.filter(course__in=courses, student__in=students)
+        self.assertUsesIndex(enrollments)
+
+
+class StudentIdSequenceTests(TestCase):
+    junior = Student.ID_PREFIXES['Junior']
+    senior = Student.ID_PREFIXES['Senior']
+
+    def test_counter_continues_after_migrated_ids(self):
+        make_student('old1', student_id=f'{self.junior}007')
+        make_student('old2', student_id=f'{self.junior}041')
+        StudentIdSequence.objects.all().delete()
+        migration = importlib.import_module('students.migrations.0011_studentidsequence')
+        migration.seed_student_id_sequences(apps, mock.Mock(connection=connection))
+        self.assertEqual(make_student('new').student_id, f'{self.junior}042')
+
+    def test_counter_created_on_first_use_continues_after_existing_ids(self):
+        make_student('old', student_id=f'{self.junior}1000')
+        StudentIdSequence.objects.all().delete()
+        self.assertEqual(Student.allocate_student_ids('Junior'), [f'{self.junior}1001'])
+
+    def test_reserved_blocks_do_not_overlap(self):
+        first = StudentIdSequence.reserve(self.junior, 5)
+        second = StudentIdSequence.reserve(self.junior, 3)
+        self.assertEqual(len(first), 5)
+        self.assertEqual(second.start, first.stop)
+        self.assertEqual(StudentIdSequence.objects.get(prefix=self.junior).last_value, second[-1])
+
+    def test_prefixes_are_separate(self):
+        juniors = Student.allocate_student_ids('Junior', 2)
+        seniors = Student.allocate_student_ids('Senior', 2)
+        self.assertTrue(all(student_id.startswith(self.junior) for student_id in juniors))
+        self.assertTrue(all(student_id.startswith(self.senior) for student_id in seniors))
+        self.assertEqual([student_id[-3:] for student_id in juniors], [student_id[-3:] for student_id in seniors])
+        self.assertEqual(make_student('senior', category='Senior').student_id, f'{self.senior}003')
+
+    def test_reserve_rejects_empty_blocks(self):
+        with self.assertRaises(ValueError):
+            StudentIdSequence.reserve(self.junior, 0)
+
+
+class StudentImportTests(TestCase):
+    columns = [
+        'username', 'first_name', 'last_name', 'email', 'password', 'date_of_birth', 'gender', 'address', 'category',
+        'department', 'father_name', 'mother_name', 'parent_phone_number', 'emergency_contact_name',
+        'emergency_contact_relationship', 'emergency_contact_phone_number', 'enrollment_year', 'current_year',
+    ]
+
+    def row(self, username, **fields):
+        row = {
+            'username': username, 'first_name': 'Aisha', 'last_name': 'Bello', 'email': f'{username}@example.com',
+            'password': 'secret-password', 'date_of_birth': '2008-05-01', 'gender': 'F', 'address': 'Kano',
+            'category': 'Junior', 'department': '', 'father_name': 'Musa', 'mother_name': 'Halima',
+            'parent_phone_number': '0801', 'emergency_contact_name': 'Musa', 'emergency_contact_relationship': 'Father',
+            'emergency_contact_phone_number': '0801', 'enrollment_year': '1', 'current_year': '1',
+        }
+        row.update(fields)
+        return row
+
+    def upload(self, rows):
+        text = io.StringIO()
+        writer = csv.DictWriter(text, self.columns)
+        writer.writeheader()
+        writer.writerows(rows)
+        return io.BytesIO(text.getvalue().encode())
+
+    def run_import(self, rows, batch_size=IMPORT_BATCH_SIZE):
+        return import_students(self.upload(rows), 'students.csv', batch_size=batch_size, max_workers=1)
+
+    def test_valid_rows_are_imported_in_batches(self):
+        rows = [self.row(f'student{n}') for n in range(5)] + [self.row('senior', category='Senior', department='ELE')]
+        result = self.run_import(rows, batch_size=2)
+        self.assertEqual((result.created, result.errors), (6, []))
+        self.assertEqual(Student.objects.filter(category='Junior').count(), 5)
+        student = Student.objects.select_related('user').get(user__username='senior')
+        self.assertTrue(student.user.check_password('secret-password'))
+        self.assertEqual(DepartmentYearStats.objects.get(category='Junior', current_year=1).student_count, 5)
+        # One block of consecutive IDs per batch and category
+        numbers = sorted(int(student_id[-3:]) for student_id in
+                         Student.objects.filter(category='Junior').values_list('student_id', flat=True))
+        self.assertEqual(numbers, list(range(1, 6)))
+
+    def test_admin_form_sends_large_files_to_the_command(self):
+        upload = SimpleUploadedFile('students.csv', b'x' * 11)
+        with mock.patch('students.forms.STUDENT_IMPORT_MAX_SIZE', 10):
+            form = StudentImportForm(files={'file': upload})
+            self.assertFalse(form.is_valid())
+        self.assertIn('manage.py import_students', form.errors['file'][0])
+
+    def test_invalid_rows_are_reported_with_their_line(self):
+        User.objects.create_user('taken')
+        result = self.run_import([
+            self.row('good'),
+            self.row('bad-email', email='not an email'),
+            self.row('no-department', category='Senior'),
+            self.row('good'),
+            self.row('taken'),
+        ])
+        self.assertEqual(result.created, 1)
+        self.assertEqual([line for line, message in result.errors], [3, 4, 5, 6])
+        self.assertIn('email', result.errors[0][1])
+        self.assertIn('Department is required', result.errors[1][1])
+        self.assertIn('more than once', result.errors[2][1])
+        self.assertIn('already exists', result.errors[3][1])
+
+    def test_failed_batch_keeps_no_rows_and_no_student_ids(self):
+        before = StudentIdSequence.objects.filter(prefix=Student.ID_PREFIXES['Junior']).values_list(
+            'last_value', flat=True).first()
+        with mock.patch('students.importers.refresh_groups', side_effect=DatabaseError('disk full')):
+            with self.assertRaises(DatabaseError):
+                self.run_import([self.row('first'), self.row('second')])
+        self.assertFalse(User.objects.filter(username__in=['first', 'second']).exists())
+        after = StudentIdSequence.objects.filter(prefix=Student.ID_PREFIXES['Junior']).values_list(
+            'last_value', flat=True).first()
+        self.assertEqual(before, after)
+
+    def test_unsupported_file_type(self):
+        with self.assertRaises(ValueError):
+            import_students(io.BytesIO(b''), 'students.txt')
+
+
+class ImageVariantTests(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.storage = FileSystemStorage(location=directory, base_url='/media/')
+
+    def save_image(self, name, width, height):
+        buffer = io.BytesIO()
+        PILImage.new('RGB', (width, height), 'red').save(buffer, 'JPEG')
+        return FieldFile(None, mock.Mock(storage=self.storage), self.storage.save(name, ContentFile(buffer.getvalue())))
+
+    def test_variants_are_their_nominal_width_and_never_upscaled(self):
+        field_file = self.save_image('news_images/photo.jpg', 800, 400)
+        self.assertEqual(generate_variants(self.storage, field_file.name), 4)
+        with self.storage.open('news_images/photo.medium.webp') as variant:
+            self.assertEqual(PILImage.open(variant).size, (640, 320))
+        self.assertFalse(self.storage.exists('news_images/photo.large.jpg'))
+
+        html = responsive_image(field_file, alt='Photo')
+        self.assertIn('/media/news_images/photo.thumbnail.webp 160w, /media/news_images/photo.medium.webp 640w"', html)
+        self.assertNotIn('1280w', html)
+        self.assertIn('src="/media/news_images/photo.medium.jpg"', html)
+
+    def test_small_image_uses_the_original(self):
+        field_file = self.save_image('news_images/icon.jpg', 100, 100)
+        self.assertEqual(generate_variants(self.storage, field_file.name), 0)
+        self.assertEqual(responsive_image(field_file), '<img src="/media/news_images/icon.jpg" alt="" class="">')
+
+    def test_regenerating_removes_variants_the_new_image_is_too_small_for(self):
+        field_file = self.save_image('news_images/photo.jpg', 1600, 800)
+        self.assertEqual(generate_variants(self.storage, field_file.name), 6)
+        self.storage.delete(field_file.name)
+        field_file = self.save_image('news_images/photo.jpg', 300, 300)
+        self.assertEqual(generate_variants(self.storage, field_file.name), 2)
+        self.assertEqual(available_variants(field_file), [('thumbnail', 160)])
+        self.assertFalse(self.storage.exists('news_images/photo.large.webp'))
+
+
+class MediaViewTests(TestCase):
+    def setUp(self):
+        parent = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, parent)
+        self.root = os.path.join(parent, 'media')
+        self.enterContext(override_settings(MEDIA_ROOT=self.root))
+        for name in ('profile_pictures/jane.jpg', 'profile_pictures/jane.thumbnail.webp',
+                     'profile_pictures/john.jpg', 'news_images/photo.jpg', '../secret.txt'):
+            path = os.path.join(self.root, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as output:
+                output.write(b'image')
+        self.jane = make_student('jane')
+        self.john = make_student('john')
+        Student.objects.filter(pk=self.jane.pk).update(profile_picture='profile_pictures/jane.jpg')
+        Student.objects.filter(pk=self.john.pk).update(profile_picture='profile_pictures/john.jpg')
+
+    def get(self, name, user=None):
+        if user is not None:
+            self.client.force_login(user)
+        return self.client.get(f'/media/{name}')
+
+    def test_public_files_are_served_to_anyone(self):
+        response = self.get('news_images/photo.jpg')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('public', response.headers['Cache-Control'])
+
+    def test_anonymous_users_cannot_see_profile_pictures(self):
+        self.assertEqual(self.get('profile_pictures/jane.jpg').status_code, 404)
+
+    def test_owner_sees_their_picture_and_its_variants(self):
+        response = self.get('profile_pictures/jane.jpg', self.jane.user)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response.headers['Cache-Control'])
+        self.assertEqual(self.get('profile_pictures/jane.thumbnail.webp').status_code, 200)
+
+    def test_other_students_pictures_are_not_found(self):
+        self.assertEqual(self.get('profile_pictures/john.jpg', self.jane.user).status_code, 404)
+
+    def test_staff_see_every_picture(self):
+        staff = User.objects.create_user('staff', password='x', is_staff=True)
+        self.assertEqual(self.get('profile_pictures/john.jpg', staff).status_code, 200)
+
+    def test_path_traversal_is_not_found(self):
+        for name in ('../secret.txt', 'news_images/../../secret.txt', 'profile_pictures/jane.jpg/../john.jpg'):
+            with self.subTest(name=name):
+                self.assertEqual(self.get(name, self.jane.user).status_code, 404)
+        staff = User.objects.create_user('staff', password='x', is_staff=True)
+        self.assertEqual(self.get('news_images/../../secret.txt', staff).status_code, 404)
+
+
+class BulkEnrollTests(TestCase):
+    def setUp(self):
+        self.students = [make_student(f'student{n}') for n in range(3)]
+        self.courses = [
+            Course.objects.create(course_code=f'C{n}', course_name=f'Course {n}', credits=3, level='JUN')
+            for n in range(2)
+        ]
+
+    def enroll(self, students, courses):
+        return bulk_enroll(
+            Student.objects.filter(pk__in=[student.pk for student in students]),
+            Course.objects.filter(pk__in=[course.pk for course in courses]),
+        )
+
+    def test_overlapping_pairs_are_enrolled_once(self):
+        self.assertEqual(self.enroll(self.students[:2], self.courses[:1]), (2, 0))
+        self.assertEqual(self.enroll(self.students, self.courses), (4, 2))
+        self.assertEqual(self.enroll(self.students, self.courses), (0, 6))
+        pairs = list(Enrollment.objects.values_list('student_id', 'course_id'))
+        self.assertEqual(len(pairs), 6)
+        self.assertEqual(len(set(pairs)), 6)
+
+    def test_nothing_to_enroll(self):
+        self.assertEqual(self.enroll([], self.courses), (0, 0))
+
+    @override_settings(MONITORING_SAMPLE_RATE=0)
+    def test_admin_action_reports_the_counts(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'x'))
+        self.enroll(self.students[:1], self.courses[:1])
+        response = self.client.post('/admin/students/course/', {
+            'action': 'register_junior_students', '_selected_action': [course.pk for course in self.courses],
+            'year': '1', 'department': '',
+        }, follow=True)
+        self.assertContains(response, '5 enrollment(s) created, 1 already registered and skipped.')
+        self.assertEqual(Enrollment.objects.count(), 6)
+
+
+class StatisticsTests(TestCase):
+    def summaries(self):
+        classes = sorted(
+            DepartmentYearStats.objects.filter(student_count__gt=0).values_list(
+                'category', 'department', 'current_year', 'student_count', 'gpa_count', 'gpa_sum', 'gpa_min',
+                'gpa_max', 'enrollment_count', 'completed_count',
+            )
+        )
+        courses = sorted(
+            CourseEnrollmentStats.objects.filter(enrollment_count__gt=0).values_list(
+                'course_id', 'category', 'department', 'current_year', 'enrollment_count', 'completed_count',
+            )
+        )
+        return classes, courses
+
+    def test_incremental_updates_match_a_rebuild(self):
+        seniors = [make_student(f'senior{i}', 'Senior', gpa=2 + i / 2) for i in range(3)]
+        junior = make_student('junior', gpa=3.1)
+        maths = Course.objects.create(course_code='MTH', course_name='Maths', credits=2)
+        physics = Course.objects.create(course_code='PHY', course_name='Physics', credits=2)
+
+        bulk_enroll(Student.objects.filter(category='Senior'), Course.objects.all())
+        enrollment = Enrollment.objects.create(student=junior, course=maths)
+        enrollment.completed = True
+        enrollment.save()
+        seniors[0].current_year = 2
+        seniors[0].save()
+        seniors[1].gpa = None
+        seniors[1].save()
+        seniors[2].delete()
+        physics.delete()
+
+        incremental = self.summaries()
+        rebuild_statistics()
+        self.assertEqual(incremental, self.summaries())
+
+        junior_class = DepartmentYearStats.objects.get(category='Junior', department='', current_year=1)
+        self.assertEqual(junior_class.gpa_mean, Decimal('3.10'))
+        self.assertEqual(junior_class.completion_rate, 1)
+
+
+class CourseCatalogTests(TestCase):
+    def setUp(self):
+        # Catalog versions change on commit, which never happens inside a test
+        cache.clear()
+        self.student = make_student('student')
+        self.maths = Course.objects.create(course_code='MTH', course_name='Maths', credits=2)
+        self.physics = Course.objects.create(course_code='PHY', course_name='Physics', credits=3, level='SEN')
+        self.client.force_login(self.student.user)
+
+    def test_catalog_lists_courses_with_enrollment_status(self):
+        Enrollment.objects.create(student=self.student, course=self.maths)
+        response = self.client.get('/courses/')
+        self.assertContains(response, 'Junior Secondary Courses')
+        self.assertContains(response, 'Senior Secondary Courses')
+        self.assertEqual(response.context['levels'][0]['courses'][0][1], False)  # Enrolled, not completed
+        self.assertEqual(response.context['levels'][0]['courses'][0][0]['enrollment_count'], 1)
+        self.assertIsNone(response.context['levels'][1]['courses'][0][1])
+
+    def test_repeat_visit_is_not_modified_until_enrollments_change(self):
+        response = self.client.get('/courses/')
+        etag = response.headers['ETag']
+        self.assertIn('private', response.headers['Cache-Control'])
+        self.assertEqual(self.client.get('/courses/', headers={'If-None-Match': etag}).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Enrollment.objects.create(student=self.student, course=self.maths)
+        response = self.client.get('/courses/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Enrolled')
+
+
+class LoginThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.enterContext(mock.patch.object(throttle, 'LOGIN_CLIENT_IP_HEADER', 'X-Forwarded-For'))
+
+    def client_ip(self, forwarded):
+        return throttle.client_ip(RequestFactory().get('/', headers={'X-Forwarded-For': forwarded}))
+
+    def test_client_ip_is_the_entry_added_by_the_trusted_proxy(self):
+        self.assertEqual(self.client_ip('10.0.0.1'), '10.0.0.1')
+        self.assertEqual(self.client_ip('1.2.3.4, 10.0.0.1'), '10.0.0.1')
+        with mock.patch.object(throttle, 'LOGIN_TRUSTED_PROXIES', 2):
+            self.assertEqual(self.client_ip('1.2.3.4, 10.0.0.1, 192.168.0.1'), '10.0.0.1')
+            self.assertEqual(self.client_ip('10.0.0.1'), '10.0.0.1')
+
+    def test_spoofed_first_entry_does_not_get_a_new_bucket(self):
+        with mock.patch.object(throttle, 'LOGIN_IP_RATE', (2, 60)):
+            statuses = [
+                self.client.post('/login/', {'username': f'user{n}', 'password': 'x'},
+                                 headers={'X-Forwarded-For': f'203.0.113.{n}, 10.0.0.1'}).status_code
+                for n in range(3)
+            ]
+        self.assertEqual(statuses, [200, 200, 429])
+
+
+class SessionWriteBehindTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.writer = SessionWriter(interval=60)
+        # Flushed by the tests instead of the background thread
+        self.writer.thread = threading.current_thread()
+        self.enterContext(mock.patch.object(sessions, 'session_writer', self.writer))
+        self.store = sessions.SessionStore()
+        self.store['step'] = 1
+        self.store.create()
+
+    def save_outside_transaction(self, **values):
+        # Only the store sees no transaction; the test's own is left alone
+        with mock.patch.object(sessions, 'connections', {'default': mock.Mock(in_atomic_block=False)}):
+            self.store.update(values)
+            self.store.save()
+
+    def stored_data(self):
+        return self.store.decode(Session.objects.get(session_key=self.store.session_key).session_data)
+
+    def test_updates_are_coalesced_into_one_write(self):
+        for step in (2, 3, 4):
+            self.save_outside_transaction(step=step)
+        self.assertEqual(self.stored_data()['step'], 1)
+        self.assertEqual(sessions.SessionStore(self.store.session_key)['step'], 4)
+        with self.assertNumQueries(1):
+            self.writer.flush()
+        self.assertEqual(self.stored_data()['step'], 4)
+
+    def test_login_is_written_through(self):
+        self.save_outside_transaction(step=2)
+        self.save_outside_transaction(**{SESSION_KEY: '1', HASH_SESSION_KEY: 'hash'})
+        self.assertEqual(self.writer.pending, {})
+        self.assertEqual(self.stored_data(), {'step': 2, SESSION_KEY: '1', HASH_SESSION_KEY: 'hash'})
+
+    def test_deleted_session_is_not_brought_back(self):
+        self.save_outside_transaction(step=2)
+        self.store.delete()
+        with self.assertNumQueries(0):
+            self.writer.flush()
+        self.assertFalse(Session.objects.exists())
+        self.assertFalse(sessions.SessionStore().exists(self.store.session_key))
+
+
+@override_settings(**CACHED_SESSIONS)
+class CachedUserTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.student = make_student('jane')
+        self.client.post('/login/', {'username': 'jane', 'password': 'x'})
+        self.assertEqual(self.client.get('/dashboard/').status_code, 200)
+        self.assertIsNotNone(cache.get(user_cache_key(self.student.user_id)))
+
+    def test_logged_out_session_is_not_served_the_cached_user(self):
+        session_key = self.client.cookies[settings.SESSION_COOKIE_NAME].value
+        self.client.get('/logout/')
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = session_key
+        self.assertEqual(self.client.get('/dashboard/').status_code, 302)
+
+    def test_deactivated_user_is_not_served_from_the_cache(self):
+        user = self.student.user
+        user.is_active = False
+        user.save()
+        self.assertIsNone(cache.get(user_cache_key(user.pk)))
+        self.assertEqual(self.client.get('/dashboard/').status_code, 302)
+
+    def test_password_change_logs_other_sessions_out(self):
+        user = self.student.user
+        user.set_password('y')
+        user.save()
+        self.assertEqual(self.client.get('/dashboard/').status_code, 302)
+
+
+class ReportCardTests(TestCase):
+    def setUp(self):
+        self.students = [make_student(username) for username in ('ann', 'bob', 'cid')]
+        course = Course.objects.create(course_code='MATH101', course_name='Mathematics', credits=4, level='JUN')
+        Enrollment.objects.create(student=self.students[0], course=course, completed=True)
+
+    def test_zip_has_one_report_per_student(self):
+        data = b''.join(stream_zip(generate_reports(Student.objects.all(), chunk_size=2, max_workers=1)))
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            self.assertEqual(archive.namelist(), [f'{student.student_id}.html' for student in self.students])
+            self.assertIn(b'MATH101', archive.read(f'{self.students[0].student_id}.html'))
+
+    def test_closing_the_generator_shuts_the_pool_down(self):
+        pool = mock.Mock(wraps=ThreadPoolExecutor(max_workers=1))
+        with mock.patch.object(reports, 'process_pool', return_value=pool):
+            reports_generator = generate_reports(Student.objects.all(), chunk_size=1)
+            next(reports_generator)
+            pool.shutdown.assert_not_called()
+            reports_generator.close()
+        pool.shutdown.assert_called_once_with(cancel_futures=True)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.students = [make_student(f'student{n}', gpa=Decimal('3.50')) for n in range(5)]
+
+    def test_csv(self):
+        lines = list(export_lines(Student.objects.all(), STUDENT_EXPORT_FIELDS, 'csv', chunk_size=2))
+        rows = list(csv.reader(io.StringIO(''.join(lines))))
+        self.assertEqual(rows[0], [column for column, lookup in STUDENT_EXPORT_FIELDS])
+        self.assertEqual([row[0] for row in rows[1:]], [student.student_id for student in self.students])
+        self.assertEqual(rows[1][1:3], ['student0', ''])
+
+    def test_jsonl(self):
+        lines = list(export_lines(Student.objects.all(), STUDENT_EXPORT_FIELDS, 'jsonl', chunk_size=2))
+        self.assertEqual(len(lines), 5)
+        first = json.loads(lines[0])
+        self.assertEqual(first['username'], 'student0')
+        self.assertEqual(first['gpa'], '3.50')
+        self.assertEqual(first['date_of_birth'], '2005-01-01')
+
+    def test_buffered_joins_lines_into_pieces(self):
+        lines = [f'{n:04}\n' for n in range(10)]
+        pieces = list(buffered(lines, size=12))
+        self.assertEqual(''.join(pieces), ''.join(lines))
+        self.assertEqual([len(piece) for piece in pieces], [15, 15, 15, 5])
+
+    def test_response(self):
+        response = export_response(Student.objects.all(), STUDENT_EXPORT_FIELDS, 'jsonl', 'students')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        self.assertRegex(response['Content-Disposition'], r'^attachment; filename="students-\d{4}-\d\d-\d\d\.jsonl"$')
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 5)
+
+
+class TransferDatabaseTests(TestCase):
+    target = 'transfer_target'
+
+    @classmethod
+    def setUpClass(cls):
+        directory = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, directory)
+        connections.settings[cls.target] = dict(connections.settings['default'], NAME=os.path.join(directory, 'target.sqlite3'))
+        cls.addClassCleanup(connections.settings.pop, cls.target)
+        cls.addClassCleanup(connections[cls.target].close)
+        # Before the test transactions start; migrating a second database must not write to the first one
+        call_command('migrate', database=cls.target, verbosity=0)
+        # Set here, not on the class: the test runner checks the declared databases before they exist
+        cls.databases = {'default', cls.target}
+        super().setUpClass()
+
+    def setUp(self):
+        self.students = [make_student(f'student{n}') for n in range(3)]
+        News.objects.create(title='Examination results', content='Results are out.')
+        News.objects.create(title='Sports day', content='Bring your kit.')
+        with connections[self.target].cursor() as cursor:
+            # Left by an earlier copy, for an id that now belongs to other news
+            get_backend(connections[self.target]).upsert(cursor, 'news', 999, 'Examination timetable', '')
+
+    def search_count(self, term):
+        with connections[self.target].cursor() as cursor:
+            return get_backend(connections[self.target]).count(cursor, [term], None)
+
+    def test_copies_the_rows_and_rebuilds_the_search_index(self):
+        output = io.StringIO()
+        call_command('transfer_database', source='default', target=self.target, interactive=False, stdout=output)
+        self.assertIn('Search index: 2 document(s)', output.getvalue())
+        self.assertEqual(
+            sorted(Student.objects.using(self.target).values_list('student_id', flat=True)),
+            sorted(student.student_id for student in self.students),
+        )
+        self.assertEqual(News.objects.using(self.target).count(), 2)
+        self.assertEqual(self.search_count('examination'), 1)
+        self.assertEqual(self.search_count('timetable'), 0)
+
+    def test_saves_on_the_target_update_its_own_index(self):
+        news = News.objects.using(self.target).create(title='Graduation ceremony', content='')
+        self.assertEqual(self.search_count('graduation'), 1)
+        self.assertEqual(SearchResults('graduation').count(), 0)
+        news.delete()
+        self.assertEqual(self.search_count('graduation'), 0)
+
+    def test_same_database_is_refused(self):
+        with self.assertRaises(CommandError):
+            call_command('transfer_database', source='default', target='default', interactive=False)
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    def setUp(self):
+        for n in range(3):
+            make_student(f'student{n}', category='Senior' if n else 'Junior')
+
+    def test_exact_count_without_an_estimate(self):
+        Student.objects.filter(user__username='student0').delete()
+        if connection.vendor == 'sqlite':
+            self.assertIsNone(estimate_row_count(Student, 'default'))
+        with mock.patch.object(paginator, 'estimate_row_count', return_value=None):
+            self.assertEqual(EstimatedCountPaginator(Student.objects.all(), 1).num_pages, 2)
+
+    def test_estimate_is_used_only_for_large_unfiltered_lists(self):
+        with mock.patch.object(paginator, 'estimate_row_count', return_value=50000):
+            self.assertEqual(EstimatedCountPaginator(Student.objects.all(), 100).count, 50000)
+            self.assertEqual(EstimatedCountPaginator(Student.objects.filter(category='Senior'), 100).count, 2)
+        with mock.patch.object(paginator, 'estimate_row_count', return_value=500):
+            self.assertEqual(EstimatedCountPaginator(Student.objects.all(), 100).count, 3)
+
+
+# A sampled request would add the INSERT of its timing
+@override_settings(MONITORING_SAMPLE_RATE=0)
+class AdminTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'x'))
+        self.course = Course.objects.create(course_code='MATH101', course_name='Mathematics', credits=4, level='JUN')
+        self.students = []
+
+    def add_enrolled_students(self, count):
+        for n in range(len(self.students), len(self.students) + count):
+            self.students.append(make_student(f'student{n}'))
+            Enrollment.objects.create(student=self.students[-1], course=self.course)
+
+    def changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return len(captured)
+
+    def test_changelist_queries_do_not_grow_with_the_rows(self):
+        for url in ('/admin/students/student/', '/admin/students/enrollment/'):
+            with self.subTest(url=url):
+                self.add_enrolled_students(2)
+                queries = self.changelist_queries(url)
+                self.add_enrolled_students(5)
+                self.assertEqual(self.changelist_queries(url), queries)
+
+    def test_enrollment_form_uses_autocomplete(self):
+        self.add_enrolled_students(2)
+        response = self.client.get('/admin/students/enrollment/add/')
+        self.assertContains(response, 'data-field-name="student"')
+        self.assertContains(response, 'data-field-name="course"')
+        response = self.client.get('/admin/autocomplete/', {
+            'app_label': 'students', 'model_name': 'enrollment', 'field_name': 'student',
+            'term': self.students[1].student_id,
+        })
+        self.assertEqual([result['id'] for result in response.json()['results']], [str(self.students[1].pk)])
+
+
+class BenchmarkSuiteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_data(students=40, courses=10, enrollments=120, news=15, announcements=5)
+
+    def test_seed_data_sizes(self):
+        self.assertEqual(Student.objects.count(), 40)
+        self.assertEqual(Course.objects.count(), 10)
+        self.assertEqual(Enrollment.objects.count(), 120)
+        self.assertEqual(DepartmentYearStats.objects.aggregate(total=Sum('student_count'))['total'], 40)
+
+    def test_seed_data_is_deterministic(self):
+        first = list(Student.objects.order_by('user__username').values_list('user__first_name', 'category', 'gpa'))
+        User.objects.filter(username__startswith='seed-').delete()
+        Course.objects.all().delete()
+        seed_data(students=40, courses=10, enrollments=120, news=0, announcements=0)
+        second = list(Student.objects.order_by('user__username').values_list('user__first_name', 'category', 'gpa'))
+        self.assertEqual(first, second)
+
+    def test_every_route_runs(self):
+        with override_settings(**CACHED_SESSIONS):
+            results = run_benchmarks(repeat=1, warmup=1)
+        self.assertEqual([result.name for result in results], [route.name for route in ROUTES])
+        queries = {result.name: result.queries for result in results}
+        # Cached pages once warm; the homepage only reads its validators, one aggregate per table
+        self.assertEqual(queries['index'], 2)
+        self.assertEqual(queries['dashboard'], 0)
+        self.assertEqual({result.name: result.status for result in results if result.name in ('logout', 'media')},
+                         {'logout': 302, 'media': 200})
+
+    def test_fixtures_refuse_a_production_database(self):
+        with mock.patch.dict(connection.settings_dict, NAME='school'):
+            with self.assertRaisesMessage(ValueError, 'DEBUG'):
+                run_benchmarks(repeat=1, warmup=0)
+            with override_settings(DEBUG=True), benchmark_settings():
+                fixture = fixtures()
+        self.assertEqual(fixture['admin'].username, 'benchmark-admin')
+        self.assertTrue(fixture['admin'].check_password(fixture['admin_password']))
+        self.assertFalse(fixture['admin'].check_password(SEED_PASSWORD))
+
+    def test_regressions(self):
+        results = run_benchmarks([route for route in ROUTES if route.name == 'index'], repeat=1, warmup=0)
+        baseline = {'index': {'queries': results[0].queries, 'median_ms': results[0].median_ms}}
+        self.assertEqual(regressions(results, baseline), [])
+        baseline['index'] = {'queries': results[0].queries - 1, 'median_ms': results[0].median_ms / 10}
+        self.assertEqual(len(regressions(results, baseline, min_delta_ms=0)), 2)
+
+    def test_template_benchmarks(self):
+        results = run_template_benchmarks(TEMPLATE_ROUTES[:2], repeat=1, warmup=1)
+        self.assertEqual([(result.name, result.mode) for result in results], [
+            ('index', 'before'), ('about', 'before'), ('index', 'after'), ('about', 'after'),
+        ])
+        self.assertTrue(all(result.render_ms > 0 for result in results))
@@ -0,0 +1,136 @@
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Token buckets as (capacity, seconds to refill one token). Every attempt from
+# an IP costs a token; for a username only failed attempts do, so other
+# people cannot lock a student out by guessing faster than they type.
+LOGIN_IP_RATE = getattr(settings, 'LOGIN_IP_RATE', (30, 1))
+LOGIN_USERNAME_RATE = getattr(settings, 'LOGIN_USERNAME_RATE', (5, 60))
+
+# Password hashes verified at the same time in one worker process; further
+# attempts get a 429 immediately instead of waiting for a free CPU
+LOGIN_MAX_CONCURRENT_VERIFICATIONS = getattr(settings, 'LOGIN_MAX_CONCURRENT_VERIFICATIONS', 4)
+
+# Request header carrying the client address when running behind a proxy, e.g. 'X-Forwarded-For'
+LOGIN_CLIENT_IP_HEADER = getattr(settings, 'LOGIN_CLIENT_IP_HEADER', None)
+
+# Proxies in front of the site that append to LOGIN_CLIENT_IP_HEADER; entries
+# left of the ones they added come from the client and can be forged
+LOGIN_TRUSTED_PROXIES = getattr(settings, 'LOGIN_TRUSTED_PROXIES', 1)
+
+LOGIN_OUTCOMES = ('accepted', 'failed', 'throttled', 'busy')
+
+_verifications = threading.BoundedSemaphore(LOGIN_MAX_CONCURRENT_VERIFICATIONS)
+
+
+def client_ip(request):
+    if LOGIN_CLIENT_IP_HEADER:
+        forwarded = request.headers.get(LOGIN_CLIENT_IP_HEADER, '')
+        if forwarded:
+            # Each trusted proxy appends the address it saw, so the client is
+            # the entry the outermost one added, counting from the right
+            entries = [entry.strip() for entry in forwarded.split(',')]
+            return entries[max(len(entries) - LOGIN_TRUSTED_PROXIES, 0)]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+class TokenBucket:
+    """
+    A token bucket kept in the cache, shared by every worker. Reads and
+    writes are not atomic, so under a race a client may get a token or two
+    more than its share; that is fine for throttling.
+    """
+
+    def __init__(self, key, capacity, refill_seconds):
+        self.key = f'login:bucket:{key}'
+        self.capacity = capacity
+        self.refill_seconds = refill_seconds
+
+    def _state(self, now):
+        tokens, updated = cache.get(self.key, (self.capacity, now))
+        return min(self.capacity, tokens + (now - updated) / self.refill_seconds)
+
+    def _store(self, tokens, now):
+        # Forget the bucket once it would be full again
+        timeout = math.ceil((self.capacity - tokens) * self.refill_seconds) + 1
+        cache.set(self.key, (tokens, now), timeout)
+
+    def retry_after(self):
+        """Seconds until a token is available, 0 when there is one now."""
+        tokens = self._state(time.time())
+        return 0 if tokens >= 1 else math.ceil((1 - tokens) * self.refill_seconds)
+
+    def consume(self):
+        now = time.time()
+        tokens = self._state(now)
+        if tokens < 1:
+            return False
+        self._store(tokens - 1, now)
+        return True
+
+    def reset(self):
+        cache.delete(self.key)
+
+
+def ip_bucket(ip):
+    return TokenBucket(f'ip:{ip}', *LOGIN_IP_RATE)
+
+
+def username_bucket(username):
+    return TokenBucket(f'user:{username.lower()}', *LOGIN_USERNAME_RATE)
+
+
+def record(outcome):
+    key = f'login:count:{outcome}'
+    # add() is a no-op when the counter exists; incr() is atomic on memcached/redis
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def login_counters():
+    counts = cache.get_many([f'login:count:{outcome}' for outcome in LOGIN_OUTCOMES])
+    return {outcome: counts.get(f'login:count:{outcome}', 0) for outcome in LOGIN_OUTCOMES}
+
+
+class LoginThrottled(Exception):
+    def __init__(self, retry_after):
+        super().__init__(retry_after)
+        self.retry_after = retry_after
+
+
+class verification_slot:
+    """
+    Context manager around password verification. Raises LoginThrottled
+    right away when this worker is already verifying its maximum number of
+    passwords.
+    """
+
+    def __enter__(self):
+        if not _verifications.acquire(blocking=False):
+            record('busy')
+            raise LoginThrottled(1)
+        return self
+
+    def __exit__(self, *exc_info):
+        _verifications.release()
+
+
+def check_login_rate(request, username):
+    """
+    Take a token for this attempt, raising LoginThrottled when the client
+    IP or the username has used up its bucket.
+    """
+    client_bucket = ip_bucket(client_ip(request))
+    user_bucket = username_bucket(username or '')
+    wait = user_bucket.retry_after()
+    if not wait and client_bucket.consume():
+        return user_bucket
+    record('throttled')
+    raise LoginThrottled(wait or client_bucket.retry_after())
@@ -1,19 +1,27 @@
 from django.conf import settings
-from django.conf.urls.static import static
 from django.urls import path
-from . import views
+from . import views, async_views, media
+
+# Serve the public read views asynchronously when running under ASGI
+public_views = async_views if settings.ASYNC_VIEWS else views
 
 urlpatterns = [
-    path('', views.index, name='index'),
+    path('', public_views.index, name='index'),
     path('login/', views.login, name='login'),
+    path('login/stats/', views.login_stats, name='login_stats'),
     path('logout/', views.logout, name='logout'),
     path('signup/', views.signup, name='signup'),
     path('about/', views.about, name='about'),
     path('courses/', views.courses, name='courses'),
     path('profile/', views.profile, name='profile'),
     path('dashboard/', views.dashboard, name='dashboard'),
-    path('news/<int:news_id>/', views.news_detail, name='news_detail'),
-    path('announcement/<int:announcement_id>/', views.announcement_detail, name='announcement_detail'),
+    path('news/<int:news_id>/', public_views.news_detail, name='news_detail'),
+    path('announcement/<int:announcement_id>/', public_views.announcement_detail, name='announcement_detail'),
+    path('news/', views.news_archive, name='news_archive'),
+    path('announcements/', views.announcement_archive, name='announcement_archive'),
+    path('search/', views.search, name='search'),
+    # Uploaded files, with permission checks on profile pictures
+    path(f"{settings.MEDIA_URL.strip('/')}/<path:path>", media.serve_media, name='media'),
     # Add other paths here
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
 
@@ -1,27 +1,42 @@
-from django.shortcuts import render, redirect, get_object_or_404, get_list_or_404
-from django.http import HttpResponse
+from django.shortcuts import render, redirect, get_object_or_404
+from django.core.paginator import Paginator
+from django.http import Http404, HttpResponse, JsonResponse
 from django.template import loader
 from django.contrib.auth import authenticate, login as auth_login, logout as auth_logout
 from django.contrib import messages
 from django import forms
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 from .models import Student, Course, Enrollment
+from .cache import DASHBOARD_CACHE_TIMEOUT
+from .catalog import catalog_etag, catalog_last_modified, course_catalog, student_enrollments
+from .throttle import LoginThrottled, check_login_rate, login_counters, record, verification_slot
 from news.models import News, Announcement  # Import your News and Announcement models
+from news.cache import homepage_fragments
+from news.http import announcement_key, homepage_key, news_key, public_page
+from news.search import SearchResults
+from news.pagination import keyset_page
 
 # Create your views here.
 
-def index(request):
-    latest_news = News.objects.all().order_by('-time')[:4]  # Get the latest 3 news
-    latest_announcements = Announcement.objects.all().order_by('-time')[:4]  # Get the latest 3 announcements
+def student_profile(user):
+    # Staff accounts and other users without a student record get a 404
+    try:
+        return user.student_profile
+    except Student.DoesNotExist:
+        raise Http404("No student profile for this account")
 
-    context = {
-        'latest_news': latest_news,
-        'latest_announcements': latest_announcements,
-    }
+@public_page(homepage_key)
+def index(request):
+    # The news and announcement blocks come pre-rendered from the homepage cache
+    context = homepage_fragments()
     return render(request, 'index.html', context)
 
 # render news
+@public_page(news_key)
 def news_detail(request, news_id):
     # Get the specific news item
     news_item = get_object_or_404(News, id=news_id)
@@ -30,18 +45,16 @@ def news_detail(request, news_id):
     latest_news = News.objects.exclude(id=news_id).order_by('-time')[:4]
 
     
-    # Process content of the current news item to split into paragraphs
-    paragraphs = [para.strip() + '.' for para in news_item.content.split('.') if para.strip()]
-
     context = {
         'latest_news': latest_news,
-        'paragraphs': paragraphs,
+        'paragraphs': news_item.paragraphs,  # Split into paragraphs when the news item was saved
         'news': news_item,
         # 'latest_announcements': latest_announcements,
     }
     return render(request, 'news_detail.html', context )
 
 # render announcements
+@public_page(announcement_key)
 def announcement_detail(request, announcement_id):
     # Get the specific anouncement item
     announcement_item = get_object_or_404(Announcement, id=announcement_id)
@@ -49,31 +62,74 @@ def announcement_detail(request, announcement_id):
     # Get latest announcements
     latest_announcements = Announcement.objects.all().order_by('-time')[:3]  # Get the latest 3 announcements
     
-    # Process content of the current announcement item to split into paragraphs
-    paragraphs = [para.strip() + '.' for para in announcement_item.content.split('.') if para.strip()]
-    
     context = {
-        'paragraphs': paragraphs,
+        'paragraphs': announcement_item.paragraphs,  # Split into paragraphs when the announcement was saved
         'announcement': announcement_item,
         'latest_announcements': latest_announcements,
     }
     return render(request, 'announcements_detail.html', context )
     
+# News archive, paged by (time, id) cursors instead of offsets
+def news_archive(request):
+    page = keyset_page(News.objects.all(), request.GET.get('before'), request.GET.get('after'))
+    return render(request, 'news_archive.html', {'page': page})
+
+# Announcement archive
+def announcement_archive(request):
+    page = keyset_page(Announcement.objects.all(), request.GET.get('before'), request.GET.get('after'))
+    return render(request, 'announcement_archive.html', {'page': page})
+
+# Search news and announcements
+def search(request):
+    query = request.GET.get('q', '').strip()
+    kind = request.GET.get('kind')
+    if kind not in ('news', 'announcement'):
+        kind = None
+
+    # Only the requested page is read from the full-text index
+    page_obj = Paginator(SearchResults(query, kind), 10).get_page(request.GET.get('page'))
+
+    context = {
+        'query': query,
+        'kind': kind,
+        'page_obj': page_obj,
+    }
+    return render(request, 'search.html', context)
+
 def login(request):
     if request.method == 'POST':
         username = request.POST.get('username')
         password = request.POST.get('password')
-        user = authenticate(request, username=username, password=password)
+        # Refuse floods before spending a password hash on them
+        try:
+            user_bucket = check_login_rate(request, username)
+            with verification_slot():
+                user = authenticate(request, username=username, password=password)
+        except LoginThrottled as throttled:
+            error_message = "Too many login attempts, please try again shortly"
+            response = render(request, 'login.html', {'error': error_message}, status=429)
+            response.headers['Retry-After'] = throttled.retry_after
+            return response
         
         if user is not None:
+            record('accepted')
+            user_bucket.reset()
             auth_login(request, user)
             return redirect('dashboard')  # Redirect to a home page or another page after successful login
         else:
             # Handle the case where authentication fails
+            record('failed')
+            user_bucket.consume()
             error_message = "Invalid username or password"
             return render(request, 'login.html', {'error': error_message})
     else:
         return render(request, 'login.html')
+
+@staff_member_required
+def login_stats(request):
+    # Login attempts by outcome since the cache was last cleared
+    return JsonResponse(login_counters())
+
 @login_required
 def logout(request):
     """Logs out the user and redirects to the home page."""
@@ -82,17 +138,16 @@ def logout(request):
     
 @login_required
 def dashboard(request):
-    # Assuming the user is logged in and has a related student profile
-    student = get_object_or_404(Student, user=request.user)
-    # Get all enrollments for the student
-    # enrollments = Enrollment.objects.filter(student=student)
+    # Loaded with the cached request.user, no query
+    student = student_profile(request.user)
+
+    # Evaluated lazily by the template, so a cached enrollment table costs no query
+    enrollments = Enrollment.objects.filter(student=student).select_related('course').order_by('course__course_code')
 
-    # If you want to ensure that there are enrollments or raise a 404 if none exist:
-    enrollments = get_list_or_404(Enrollment, student=student)
-        
     context = {
         'student': student,
-        'enrollments': enrollments
+        'enrollments': enrollments,
+        'enrollments_cache_timeout': DASHBOARD_CACHE_TIMEOUT,
     }
     # Pass the student and enrolled objects to the template context
     return render(request, 'dashboard.html', context)
@@ -109,7 +164,7 @@ def about(request):
 @login_required
 def profile(request):
     #Assuming the user is logged in and has a related student profile
-    student = get_object_or_404(Student, user=request.user)
+    student = student_profile(request.user)
     
     context = {
         'student': student,
@@ -117,6 +172,33 @@ def profile(request):
     return render(request, 'profile.html', context)
 
 
+def course_enrollments(request):
+    # The student's own enrollments, read once for both the ETag and the page
+    if not hasattr(request, '_course_enrollments'):
+        try:
+            student = request.user.student_profile
+        except Student.DoesNotExist:
+            student = None  # Staff see the catalog without enrollment status
+        request._course_enrollments = student_enrollments(student)
+    return request._course_enrollments
+
+def courses_etag(request):
+    return catalog_etag(course_enrollments(request))
+
+def courses_last_modified(request):
+    return catalog_last_modified()
+
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=courses_etag, last_modified_func=courses_last_modified)
 def courses(request):
-    pass
\ No newline at end of file
+    # The catalog is shared and cached; only the enrollment status is the student's
+    enrollments = course_enrollments(request)
+    levels = [
+        {
+            'name': level['name'],
+            'courses': [(course, enrollments.get(course['pk'])) for course in level['courses']],
+        }
+        for level in course_catalog()
+    ]
+    return render(request, 'courses.html', {'levels': levels})
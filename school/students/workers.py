@@ -0,0 +1,23 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+
+
+def _initialize_worker():
+    # Child processes need the app registry before touching models or templates
+    django.setup()
+
+
+def worker_count():
+    # Number of processes for CPU heavy jobs (password hashing, report rendering)
+    return getattr(settings, 'STUDENTS_WORKER_PROCESSES', None) or os.cpu_count() or 1
+
+
+def process_pool(max_workers=None):
+    """
+    Return a ProcessPoolExecutor whose workers have Django set up. Use it as a
+    context manager so the processes are shut down when the job is done.
+    """
+    return ProcessPoolExecutor(max_workers=max_workers or worker_count(), initializer=_initialize_worker)